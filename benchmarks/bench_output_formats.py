@@ -0,0 +1,65 @@
+"""
+Write time, size on disk and read-back time of the warehouse tables in csv, parquet and arrow format.
+
+Uses the input files configured in config/setting.py. Run from the project root:
+    python -m benchmarks.bench_output_formats
+"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+import pandas as pd
+from config.setting import REQUIREMENTS_DATA_PATH, WATCHES_DATA_PATH
+from scripts.extract import extract_csv
+from scripts.load import OUTPUT_FORMATS, save_table
+from scripts.pipeline import build_requirements_tables, build_watches_tables
+from scripts.transform import REQUIREMENTS_RAW_DTYPES, WATCHES_RAW_DTYPES, transform_data_requirements, transform_data_watches
+
+def read_back(path, output_format):
+    """
+    Read one written table back into pandas
+    """
+    if output_format == "csv":
+        return pd.read_csv(path + ".csv")
+
+    import pyarrow.dataset as ds
+    file_format = "parquet" if output_format == "parquet" else "ipc"
+    return ds.dataset(path, format=file_format, partitioning="hive").to_table().to_pandas()
+
+def size_on_disk(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(path) for f in files)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--formats", nargs="+", default=list(OUTPUT_FORMATS), choices=list(OUTPUT_FORMATS))
+    args = parser.parse_args()
+
+    tables = {
+        **build_requirements_tables(transform_data_requirements(extract_csv(REQUIREMENTS_DATA_PATH, dtype=REQUIREMENTS_RAW_DTYPES))),
+        **build_watches_tables(transform_data_watches(extract_csv(WATCHES_DATA_PATH, dtype=WATCHES_RAW_DTYPES)))
+        }
+
+    print(f"{'format':<10}{'write (s)':>11}{'size (MB)':>11}{'read (s)':>10}")
+    for output_format in args.formats:
+        with tempfile.TemporaryDirectory() as output_dir:
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                for name, table in tables.items():
+                    save_table(table, name, output_format=output_format, output_dir=output_dir)
+            write_time = time.perf_counter() - start
+
+            size = sum(size_on_disk(os.path.join(output_dir, entry)) for entry in os.listdir(output_dir))
+
+            start = time.perf_counter()
+            for name, table in tables.items():
+                assert len(read_back(os.path.join(output_dir, name), output_format)) == len(table)
+            read_time = time.perf_counter() - start
+
+        print(f"{output_format:<10}{write_time:>11.2f}{size / 1_000_000:>11.2f}{read_time:>10.2f}")
+
+if __name__ == "__main__":
+    main()
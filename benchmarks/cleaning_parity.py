@@ -0,0 +1,94 @@
+"""
+Parity check of the vectorized cleaners (utils/cleaning.py) against the row-wise ones, on every distinct value
+of the real input file and on edge cases (missing values, empty strings, unknown company suffixes ...).
+Every mismatch is printed and the check exits with an error, run it after any change to the cleaners.
+
+The row-wise cleaners raise on missing values (the transform drops/fills them first), the vectorized ones
+treat them as empty strings, except company_case_logic which leaves them missing. That is what is checked.
+
+Run from the project root:
+    python -m benchmarks.cleaning_parity
+    python -m benchmarks.cleaning_parity --input benchmarks/data/1m/data_requirements.csv
+"""
+import argparse
+import sys
+import numpy as np
+import pandas as pd
+from benchmarks.bench_cleaning import CASES
+from config.setting import REQUIREMENTS_DATA_PATH
+
+EDGE_CASES = [
+    np.nan, None, "", "   ", "\n", "-1", "123", ",", "$", "Unknown", "Unknown / Non-Applicable",
+    # company names: unknown suffixes, suffix only, punctuation and case mixes
+    "Foo GmbH", "Bar S.A.", "Baz AG", "INC", "co", "Acme, Inc.", "acme inc.", "ACME LLC (US)", "Ltd Partners",
+    "Data Co-op", "ÉCOLE INC", "mIxEd Corp", "Costco Wholesale\n4.1",
+    # locations
+    "Remote", "United States", "a, b, c", "Austin,TX", " Austin, TX ", "Texas", "Somewhere, ZZ",
+    # job titles
+    "Sr.", "Senior", "data engineer, senior", "INTERN", "Lead", "Engineer II", "Data Engineer Level 3",
+    # revenues
+    "$10+ billion (USD)", "Less than $1 million (USD)", "$1 to $5 billion", "$5 to $25 million (USD)"
+    ]
+
+# cleaners whose vectorized version leaves missing values missing (the others clean them like "")
+KEEP_MISSING = {"company_case_logic"}
+
+def as_frame(result):
+    return result.to_frame() if isinstance(result, pd.Series) else result
+
+def reference(name, row_wise, values):
+    """
+    Row-wise output for values, missing values cleaned as empty strings (or kept missing, see KEEP_MISSING)
+    """
+    missing = values.isna()
+    result = as_frame(row_wise(values.where(~missing, "")))
+    if name in KEEP_MISSING:
+        result = result.where(~missing, None)
+    return result
+
+def mismatches(name, row_wise, vectorized, values):
+    """
+    Input values whose vectorized output differs from the row-wise output, with both outputs
+    """
+    expected = reference(name, row_wise, values).reset_index(drop=True)
+    actual = as_frame(vectorized(values)).reset_index(drop=True)
+    if expected.shape != actual.shape:
+        raise ValueError(f"shape {actual.shape}, expected {expected.shape}")
+
+    expected.columns = actual.columns
+    same = (expected == actual) | (expected.isna() & actual.isna())
+    rows = np.flatnonzero(~same.all(axis=1).to_numpy())
+    return [(values.iloc[row], expected.iloc[row].tolist(), actual.iloc[row].tolist()) for row in rows]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", default=REQUIREMENTS_DATA_PATH, help="data_requirements csv file")
+    parser.add_argument("--show", type=int, default=10, help="mismatches printed per cleaner")
+    args = parser.parse_args()
+
+    raw = pd.read_csv(args.input, dtype=str)
+    failed = False
+    for name, column, row_wise_func, vectorized_func in CASES:
+        values = pd.concat([pd.Series(EDGE_CASES, dtype=object), raw[column].drop_duplicates()], ignore_index=True)
+        try:
+            found = mismatches(name, row_wise_func, vectorized_func, values)
+        except Exception as e:
+            print(f"{name:<22}ERROR {e!r}")
+            failed = True
+            continue
+
+        if found:
+            failed = True
+            print(f"{name:<22}{len(found)} of {len(values)} values differ")
+            for value, expected, actual in found[:args.show]:
+                print(f"    {value!r}: row-wise {expected}, vectorized {actual}")
+        else:
+            print(f"{name:<22}{len(values)} values match")
+
+    if failed:
+        print("\nVectorized cleaners do not match the row-wise cleaners.")
+        sys.exit(1)
+    print(f"\nAll vectorized cleaners match the row-wise output ({args.input} and {len(EDGE_CASES)} edge cases).")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,231 @@
+"""
+Synthetic data_requirements.csv and Watches.csv shaped inputs for benchmarks, at any size.
+
+Values follow the messy formats of the real files (company suffixes and ratings after a newline,
+"City, ST" locations, salary and revenue strings, scraped prices like "₹1,299" and text in numeric
+columns) with realistic cardinalities: up to 5,000 companies, about 1,700 job titles, 40
+locations, unique descriptions, images and links.
+
+Run from the project root:
+    python -m benchmarks.generators --rows 1m --output-dir benchmarks/data/1m
+"""
+import argparse
+import os
+import numpy as np
+import pandas as pd
+
+# Named benchmark sizes
+SIZES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000, "10m": 10_000_000}
+
+# Files are generated and written in blocks of rows so 10M rows never sit in memory at once
+BLOCK_ROWS = 500_000
+
+COMPANY_STEMS = ["Acme", "Globex", "Initech", "Umbrella", "Stark", "Wayne", "Hooli", "Pied Piper", "Cyberdyne", "Soylent",
+                 "Tyrell", "Wonka", "Vandelay", "Massive Dynamic", "Aperture", "Oscorp", "Gringotts", "Dunder Mifflin",
+                 "Prestige Worldwide", "Nakatomi", "Gekko", "Monarch", "Sterling Cooper", "Bluth", "Virtucon", "Data",
+                 "Analytics", "Cloud", "Quantum", "Blue Sky"]
+COMPANY_WORDS = ["Systems", "Solutions", "Technologies", "Labs", "Group", "Partners", "Health", "Capital", "Digital",
+                 "Networks", "Software", "Consulting", "Industries", "Foods", "Energy", "Media", "Logistics", "Bank"]
+# messy suffix variants as they appear in the scraped company column
+COMPANY_SUFFIXES = ["", "", " Inc", " Inc.", ", Inc.", " INC", " LLC", ", LLC", " llc", " Corp", " Corp.", " Ltd",
+                    " Ltd.", " Co", " Co.", ".com", " (US)"]
+
+CITIES = [("Austin", "TX"), ("Dallas", "TX"), ("Houston", "TX"), ("New York", "NY"), ("Brooklyn", "NY"),
+          ("San Jose", "CA"), ("San Francisco", "CA"), ("Los Angeles", "CA"), ("San Diego", "CA"), ("Seattle", "WA"),
+          ("Redmond", "WA"), ("Chicago", "IL"), ("Boston", "MA"), ("Cambridge", "MA"), ("Atlanta", "GA"),
+          ("Denver", "CO"), ("Phoenix", "AZ"), ("Miami", "FL"), ("Tampa", "FL"), ("Charlotte", "NC"),
+          ("Raleigh", "NC"), ("Columbus", "OH"), ("Detroit", "MI"), ("Minneapolis", "MN"), ("Portland", "OR"),
+          ("Salt Lake City", "UT"), ("Nashville", "TN"), ("Philadelphia", "PA"), ("Pittsburgh", "PA"),
+          ("Washington", "DC"), ("Arlington", "VA"), ("Baltimore", "MD"), ("St. Louis", "MO"), ("Madison", "WI")]
+OTHER_LOCATIONS = ["Remote", "United States", "California", "Texas", "New York State", "Washington State"]
+
+SENIORITY_PREFIXES = ["", "", "", "Senior ", "Sr. ", "Junior ", "Jr. ", "Lead ", "Staff ", "Principal ", "Associate ",
+                      "Mid ", "Head of "]
+ROLES = ["Data Engineer", "Data Analyst", "Data Scientist", "Software Engineer", "Analytics Engineer",
+         "Machine Learning Engineer", "BI Developer", "Database Administrator", "Cloud Engineer", "ETL Developer",
+         "Data Architect", "Network Engineer", "Systems Engineer", "Product Manager", "Engineering Manager",
+         "Data Center Technician", "Big Data Engineer", "Research Scientist", "Data Engineering Intern"]
+LEVEL_SUFFIXES = ["", "", "", " I", " II", " III", " IV", " Level 2", " - Remote", " (Contract)"]
+
+COMPANY_SIZES = ["1 to 50 Employees", "51 to 200 Employees", "201 to 500 Employees", "501 to 1000 Employees",
+                 "1001 to 5000 Employees", "5001 to 10000 Employees", "10000+ Employees", "Unknown", None]
+COMPANY_TYPES = ["Company - Private", "Company - Public", "Nonprofit Organization", "Subsidiary or Business Segment",
+                 "Government", "College / University", "Unknown", None]
+SECTORS = {
+    "Information Technology": ["Software Development", "Information Technology Support Services", "Computer Hardware Development"],
+    "Finance": ["Banking & Lending", "Investment & Asset Management", "Insurance Carriers"],
+    "Healthcare": ["Health Care Services & Hospitals", "Biotech & Pharmaceuticals"],
+    "Retail & Wholesale": ["General Merchandise & Superstores", "Grocery Stores"],
+    "Manufacturing": ["Electronics Manufacturing", "Machinery Manufacturing"],
+    "Media & Communication": ["Broadcast Media", "Telecommunications Services"]
+    }
+REVENUES = ["Less than $1 million (USD)", "$1 to $5 million (USD)", "$5 to $25 million (USD)",
+            "$25 to $100 million (USD)", "$100 to $500 million (USD)", "$500 million to $1 billion (USD)",
+            "$1 to $5 billion (USD)", "$5 to $10 billion (USD)", "$10+ billion (USD)", "Unknown / Non-Applicable", None]
+DESCRIPTION_WORDS = ["data", "pipelines", "python", "sql", "spark", "cloud", "warehouse", "dashboards", "stakeholders",
+                     "airflow", "modeling", "streaming", "quality", "kafka", "etl", "analytics", "reporting", "aws"]
+
+WATCH_BRANDS = ["Fossil", "Titan", "Casio", "Daniel Wellington", "Emporio Armani", "Emporio Armaniquartz", "Sonata",
+                "Fastrack", "Timex", "Tommy Hilfiger", "Michael Kors", "Seiko", "Citizen", "Guess", "Noise", "boAt",
+                "Fire-Boltt", "Amazfit", "Garmin", "Apple", "Samsung", "Neo Victory", "Sylvi", "Noname"]
+WATCH_MODELS = ["Analog Watch", "Digital Watch", "Smartwatch", "Chronograph", "G-Shock", "Classic", "Automatic",
+                "Men Watch", "Women Watch", "Sport", "Quartz", "Leather Strap", "Stainless Steel"]
+WATCH_SUB_CATEGORIES = ["Watches", "Men's Watches", "Women's Watches", "Smart Watches"]
+
+def _choice(rng, values, rows, p=None):
+    return rng.choice(np.array(values, dtype=object), rows, p=p)
+
+def _zipf_index(rng, cardinality, rows, a=1.3):
+    """
+    Indices in [0, cardinality) with a long tail: a few values are very frequent, most are rare
+    """
+    return (rng.zipf(a, rows) - 1) % cardinality
+
+def _money(amounts, decimals):
+    """
+    Amounts formatted with thousands separators ("1,299" or "44.23")
+    """
+    return pd.Series(amounts).map(f"{{:,.{decimals}f}}".format).to_numpy(dtype=object)
+
+def company_names(count, seed=42):
+    """
+    count distinct company names: stem + word ("Acme Labs"), numbered past every combination
+    ("Acme Labs 2"), then a messy suffix and case
+    """
+    rng = np.random.default_rng(seed)
+    index = np.arange(count)
+    words = COMPANY_WORDS + [""]
+    stems = np.array(COMPANY_STEMS, dtype=object)[index % len(COMPANY_STEMS)]
+    names = pd.Series(stems + " " + np.array(words, dtype=object)[index // len(COMPANY_STEMS) % len(words)]).str.strip()
+    repeat = pd.Series(index // (len(COMPANY_STEMS) * len(words)))
+    names = names.where(repeat == 0, names + " " + (repeat + 1).astype(str))
+
+    names = names + _choice(rng, COMPANY_SUFFIXES, count)
+    case = rng.integers(0, 10, count)
+    names = names.where(case > 0, names.str.upper()).where(case != 1, names.str.lower())
+    # the scraped company column sometimes has the company rating after a newline
+    rated = rng.random(count) < 0.3
+    names[rated] = names[rated] + "\n" + pd.Series(rng.uniform(2.5, 5, count).round(1)).astype(str)[rated]
+    return names.to_numpy(dtype=object)
+
+def generate_requirements(rows, seed=42, start=0, total_rows=None):
+    """
+    data_requirements.csv shaped dataframe, start is the first row number (Unnamed: 0).
+    total_rows (the whole file when generated in blocks) sets the number of companies
+    """
+    rng = np.random.default_rng([seed, start])
+    companies = company_names(max(50, min(5_000, (total_rows or rows) // 20)), seed)
+    locations = np.array([f"{city}, {state}" for city, state in CITIES] + OTHER_LOCATIONS, dtype=object)
+    job_titles = np.array([prefix + role + suffix for prefix in SENIORITY_PREFIXES for role in ROLES
+                           for suffix in LEVEL_SUFFIXES], dtype=object)
+
+    sectors = _choice(rng, list(SECTORS) + [None], rows)
+    industries = np.array([None if sector is None else SECTORS[sector][i % len(SECTORS[sector])]
+                           for sector, i in zip(sectors, rng.integers(0, 3, rows))], dtype=object)
+
+    hourly = rng.random(rows) < 0.3
+    salary = np.where(hourly, _money(rng.uniform(15, 95, rows), 2), _money(rng.integers(40_000, 250_000, rows), 0))
+    salary = np.char.add(np.char.add("$", salary.astype(str)), np.where(hourly, " /hr", " /yr")).astype(object)
+    salary[rng.random(rows) < 0.1] = None
+
+    row_numbers = np.arange(start, start + rows)
+    words = _choice(rng, DESCRIPTION_WORDS, (rows, 12))
+    descriptions = pd.Series([" ".join(row) for row in words]) + " #" + pd.Series(row_numbers).astype(str)
+
+    dates = pd.Timestamp("2024-01-01", tz="UTC") + pd.to_timedelta(rng.integers(0, 366 * 86_400, rows), unit="s")
+    founded = rng.integers(1850, 2024, rows).astype(float)
+    founded[rng.random(rows) < 0.15] = np.nan
+    rating = rng.uniform(1, 5, rows).round(1)
+    rating[rng.random(rows) < 0.1] = np.nan
+
+    return pd.DataFrame({
+        "Unnamed: 0": row_numbers,
+        "company": companies[_zipf_index(rng, len(companies), rows)],
+        "company_rating": rating,
+        "location": locations[_zipf_index(rng, len(locations), rows, a=1.1)],
+        "job_title": job_titles[_zipf_index(rng, len(job_titles), rows, a=1.1)],
+        "job_description": descriptions.to_numpy(dtype=object),
+        "salary_estimate": salary,
+        "company_size": _choice(rng, COMPANY_SIZES, rows),
+        "company_type": _choice(rng, COMPANY_TYPES, rows),
+        "company_sector": sectors,
+        "company_industry": industries,
+        "company_founded": founded,
+        "company_revenue": _choice(rng, REVENUES, rows),
+        "dates": dates.astype(str)
+        })
+
+def generate_watches(rows, seed=42, start=0, total_rows=None):
+    """
+    Watches.csv shaped dataframe, start is the first row number (used in image/link)
+    """
+    rng = np.random.default_rng([seed, start, 1])
+    row_numbers = pd.Series(np.arange(start, start + rows)).astype(str)
+    brands = _choice(rng, WATCH_BRANDS, rows)
+    models = _choice(rng, WATCH_MODELS, rows)
+    names = pd.Series(brands + " " + models + " " + rng.integers(100, 9_999, rows).astype(str))
+    # brand names are not always capitalized in the scraped product names
+    names = names.where(rng.random(rows) > 0.2, names.str.lower())
+
+    actual = rng.integers(199, 49_999, rows)
+    discount = (actual * rng.uniform(0.3, 1, rows)).round()
+    actual_price = np.char.add("₹", _money(actual, 0).astype(str)).astype(object)
+    discount_price = np.char.add("₹", _money(discount, 0).astype(str)).astype(object)
+    actual_price[rng.random(rows) < 0.05] = None
+    discount_price[rng.random(rows) < 0.15] = None
+
+    ratings = rng.uniform(1, 5, rows).round(1).astype(str).astype(object)
+    ratings[rng.random(rows) < 0.05] = "FREE"
+    ratings[rng.random(rows) < 0.03] = "Get"
+    ratings[rng.random(rows) < 0.1] = None
+    no_of_ratings = _money(rng.zipf(1.5, rows) % 100_000, 0)
+    no_of_ratings[rng.random(rows) < 0.03] = "Only"
+    no_of_ratings[rng.random(rows) < 0.1] = None
+
+    return pd.DataFrame({
+        "name": names.to_numpy(dtype=object),
+        "main_category": "accessories",
+        "sub_category": _choice(rng, WATCH_SUB_CATEGORIES, rows),
+        "image": ("https://m.media-amazon.com/images/I/" + row_numbers + ".jpg").to_numpy(dtype=object),
+        "link": ("https://www.amazon.in/dp/B0" + row_numbers.str.zfill(8)).to_numpy(dtype=object),
+        "ratings": ratings,
+        "no_of_ratings": no_of_ratings,
+        "discount_price": discount_price,
+        "actual_price": actual_price
+        })
+
+def _write_blocks(generate, rows, path, seed):
+    for start in range(0, rows, BLOCK_ROWS):
+        block = generate(min(BLOCK_ROWS, rows - start), seed, start, rows)
+        block.to_csv(path, mode="w" if start == 0 else "a", header=start == 0, index=False)
+
+def write_dataset(rows, output_dir, seed=42):
+    """
+    Write data_requirements.csv and Watches.csv with rows rows each into output_dir,
+    returns their paths. The same rows and seed always give the same files
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    requirements_path = os.path.join(output_dir, "data_requirements.csv")
+    watches_path = os.path.join(output_dir, "Watches.csv")
+    _write_blocks(generate_requirements, rows, requirements_path, seed)
+    _write_blocks(generate_watches, rows, watches_path, seed)
+    return requirements_path, watches_path
+
+def parse_rows(value):
+    """
+    Row count from a named size (10k, 100k, 1m, 10m) or a plain number
+    """
+    return SIZES[value.lower()] if value.lower() in SIZES else int(value)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=parse_rows, default="100k", help="10k, 100k, 1m, 10m or a number of rows")
+    parser.add_argument("--output-dir", default="benchmarks/data")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    for path in write_dataset(args.rows, args.output_dir, args.seed):
+        print(f"{args.rows} rows written to: {path}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
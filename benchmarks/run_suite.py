@@ -0,0 +1,175 @@
+"""
+Benchmark suite: times extract, transform_data_requirements, transform_data_watches, data_demographi,
+table slicing, the warehouse CSV writes and the database load separately on synthetic inputs
+(benchmarks/generators.py), and compares the timings with a stored baseline.
+
+The database part runs on a SQLite stand-in (df.to_sql into a temporary file) by default,
+--db postgres loads into the database of config/setting.py instead (a full load, tables are truncated).
+
+Run from the project root:
+    python -m benchmarks.run_suite --sizes 10k 100k
+    python -m benchmarks.run_suite --sizes 10k 100k --update-baseline
+    python -m benchmarks.run_suite --sizes 1m --db postgres --data-dir benchmarks/data
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sqlite3
+import sys
+import tempfile
+import time
+import pandas as pd
+from benchmarks.generators import SIZES, parse_rows, write_dataset
+from config.setting import LOAD_METHOD
+from scripts.extract import extract_csv
+from scripts.load import load_tables, save_table, with_time_of_day
+from scripts.pipeline import build_requirements_tables, build_watches_tables
+from scripts.transform import REQUIREMENTS_RAW_DTYPES, WATCHES_RAW_DTYPES, transform_data_requirements, transform_data_watches
+from utils.data_profile import data_demographi
+from utils.instrument import start_run
+
+BASELINE_PATH = "benchmarks/baseline.json"
+
+# a benchmark slower than baseline * (1 + tolerance) is reported as a regression,
+# unless it is only a few milliseconds slower (timer noise on the small sizes)
+DEFAULT_TOLERANCE = 0.25
+MIN_REGRESSION_SECONDS = 0.05
+
+def timed(func, repeat=1):
+    """
+    Best wall time of repeat calls of func (its prints are silenced), returns (last result, seconds)
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            result = func()
+            best = min(best, time.perf_counter() - start)
+    return result, best
+
+def load_sqlite(tables, path):
+    """
+    SQLite stand-in for the PostgreSQL load: every table replaced with df.to_sql in one transaction
+    """
+    with sqlite3.connect(path) as conn:
+        for name, table in tables.items():
+            with_time_of_day(table).to_sql(name, conn, if_exists="replace", index=False)
+
+def write_csv(tables, output_dir):
+    for name, table in tables.items():
+        save_table(table, name, output_format="csv", output_dir=output_dir)
+
+def run_size(rows, data_dir, work_dir, db="sqlite", repeat=1):
+    """
+    Run every benchmark on one input size, returns {benchmark: {"seconds", "rows", "rows_per_sec"}}
+    """
+    requirements_path = os.path.join(data_dir, "data_requirements.csv")
+    watches_path = os.path.join(data_dir, "Watches.csv")
+    if not (os.path.exists(requirements_path) and os.path.exists(watches_path)):
+        write_dataset(rows, data_dir)
+
+    results = {}
+
+    def record(name, func, row_count):
+        result, seconds = timed(func, repeat)
+        results[name] = {"seconds": round(seconds, 4), "rows": row_count,
+                         "rows_per_sec": round(row_count / seconds) if seconds > 0 else None}
+        print(f"  {name:<24}{seconds:>10.3f}s{results[name]['rows_per_sec'] or 0:>14,} rows/sec")
+        return result
+
+    raw_requirements = record("extract_requirements", lambda: extract_csv(requirements_path, dtype=REQUIREMENTS_RAW_DTYPES), rows)
+    raw_watches = record("extract_watches", lambda: extract_csv(watches_path, dtype=WATCHES_RAW_DTYPES), rows)
+
+    # the transforms change their input frame in place, so every call gets its own copy
+    requirements = record("transform_requirements", lambda: transform_data_requirements(raw_requirements.copy()), rows)
+    watches = record("transform_watches", lambda: transform_data_watches(raw_watches.copy()), rows)
+
+    record("profile_requirements", lambda: data_demographi(requirements), len(requirements))
+    record("profile_watches", lambda: data_demographi(watches), len(watches))
+
+    tables = record("build_tables", lambda: {**build_requirements_tables(requirements), **build_watches_tables(watches)},
+                    len(requirements) + len(watches))
+    table_rows = sum(len(table) for table in tables.values())
+
+    record("write_csv", lambda: write_csv(tables, os.path.join(work_dir, "warehouse")), table_rows)
+
+    if db == "sqlite":
+        record("load_sqlite", lambda: load_sqlite(tables, os.path.join(work_dir, "warehouse.db")), table_rows)
+    elif db == "postgres":
+        record("load_postgres", lambda: load_tables(tables, method=LOAD_METHOD, mode="full"), table_rows)
+    return results
+
+def machine_info():
+    return {"platform": platform.platform(), "python": platform.python_version(), "pandas": pd.__version__,
+            "cpu_count": os.cpu_count()}
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return {"machine": None, "results": {}}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def compare(results, baseline, tolerance):
+    """
+    Print every benchmark against the baseline, returns the regressions [(size, benchmark, ratio)]
+    """
+    regressions = []
+    print(f"\n{'size':<6}{'benchmark':<24}{'baseline (s)':>14}{'current (s)':>13}{'ratio':>8}")
+    for size, benchmarks in results.items():
+        for name, result in benchmarks.items():
+            previous = baseline["results"].get(size, {}).get(name)
+            if previous is None:
+                print(f"{size:<6}{name:<24}{'-':>14}{result['seconds']:>13.3f}{'-':>8}  new")
+                continue
+
+            ratio = result["seconds"] / previous["seconds"] if previous["seconds"] > 0 else float("inf")
+            status = ""
+            if ratio > 1 + tolerance and result["seconds"] - previous["seconds"] > MIN_REGRESSION_SECONDS:
+                status = "REGRESSION"
+                regressions.append((size, name, ratio))
+            elif ratio < 1 - tolerance:
+                status = "faster"
+            print(f"{size:<6}{name:<24}{previous['seconds']:>14.3f}{result['seconds']:>13.3f}{ratio:>7.2f}x  {status}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", default=["10k", "100k"], help=f"named sizes ({', '.join(SIZES)}) or row counts")
+    parser.add_argument("--db", choices=["sqlite", "postgres", "none"], default="sqlite")
+    parser.add_argument("--repeat", type=int, default=3, help="best of n runs per benchmark")
+    parser.add_argument("--data-dir", help="keep (and reuse) the generated inputs here instead of a temporary directory")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--update-baseline", action="store_true", help="store these results as the new baseline")
+    args = parser.parse_args()
+
+    # the stages of the benchmarked functions are not recorded, the production run report stays untouched
+    start_run(report_path=None)
+    results = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        for size in args.sizes:
+            rows = parse_rows(size)
+            data_dir = os.path.join(args.data_dir or work_dir, size)
+            print(f"\n{size} ({rows:,} rows)")
+            results[size] = run_size(rows, data_dir, work_dir, args.db, args.repeat)
+
+    baseline = load_baseline(args.baseline)
+    if baseline["machine"] and baseline["machine"] != machine_info():
+        print(f"\nWarning: baseline recorded on a different machine/environment: {baseline['machine']}")
+    regressions = compare(results, baseline, args.tolerance)
+
+    if args.update_baseline:
+        baseline["machine"] = machine_info()
+        baseline["results"].update(results)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2)
+        print(f"\nBaseline updated: {args.baseline}")
+    elif regressions:
+        print(f"\n{len(regressions)} benchmark(s) slower than the baseline by more than {args.tolerance:.0%}.")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
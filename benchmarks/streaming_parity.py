@@ -0,0 +1,105 @@
+"""
+Parity check of the streaming pipeline against the batch pipeline on small chunks: every table built chunk by chunk
+(scripts/pipeline.py stream_dataset) must have the same rows as the table built from the whole file.
+Small chunks are where a text column can hold only numbers or only missing values (a chunk of 1 row always does),
+so this is the check for the raw dtypes and the missing-value handling of the transforms.
+Every differing table (or transform error) is printed and the check exits with an error.
+
+Surrogate ids are numbered in order of appearance chunk by chunk, so the streaming runs start from the key map
+of the batch run (like a second run of the pipeline does) and all ids are the same.
+
+Run from the project root:
+    python -m benchmarks.streaming_parity
+    python -m benchmarks.streaming_parity --chunksizes 1 7 500 --rows 0
+"""
+import argparse
+import contextlib
+import copy
+import io
+import os
+import sys
+import tempfile
+import pandas as pd
+from config.setting import REQUIREMENTS_DATA_PATH, WATCHES_DATA_PATH
+from scripts.extract import extract_csv
+from scripts.pipeline import build_requirements_tables, build_watches_tables, stream_dataset
+from scripts.transform import REQUIREMENTS_RAW_DTYPES, WATCHES_RAW_DTYPES, transform_data_requirements, transform_data_watches
+from utils.cleaning_cache import CleaningCache
+from utils.instrument import start_run
+from utils.run_state import table_hash
+
+def requirements_transform(key_map):
+    # new cleaning cache per run, so every run cleans every value itself
+    cache = CleaningCache()
+    return lambda df: transform_data_requirements(df, key_map, cache)
+
+def watches_transform(key_map):
+    cache = CleaningCache()
+    return lambda df: transform_data_watches(df, cache)
+
+# dataset: (input file, raw dtypes, transform function for a key map, table builder)
+DATASETS = {
+    "requirements": (REQUIREMENTS_DATA_PATH, REQUIREMENTS_RAW_DTYPES, requirements_transform, build_requirements_tables),
+    "watches": (WATCHES_DATA_PATH, WATCHES_RAW_DTYPES, watches_transform, build_watches_tables)
+    }
+
+def head_csv(path, rows, work_dir):
+    """
+    Copy of the first rows of a csv file (values kept as written)
+    """
+    if not rows:
+        return path
+    head_path = os.path.join(work_dir, os.path.basename(path))
+    pd.read_csv(path, nrows=rows, dtype=str, keep_default_na=False).to_csv(head_path, index=False)
+    return head_path
+
+def batch_hashes(path, dtype, transform, build, key_map):
+    # the prints of the transforms are not shown
+    with contextlib.redirect_stdout(io.StringIO()):
+        tables = build(transform(key_map)(extract_csv(path, dtype=dtype)))
+    return {name: (table_hash(table), len(table)) for name, table in tables.items()}
+
+def streaming_hashes(path, dtype, transform, build, key_map, chunksize):
+    hashes = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        stream_dataset(path, transform(copy.deepcopy(key_map)), build, chunksize, write_output=False, table_hashes=hashes, dtype=dtype)
+    return {name: (table.hexdigest(), table.rows) for name, table in hashes.items()}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunksizes", nargs="+", type=int, default=[1, 7, 500])
+    parser.add_argument("--rows", type=int, default=600, help="rows read from each input file, 0 for the whole files")
+    args = parser.parse_args()
+
+    # the stages of the checked runs are not recorded in the run report
+    start_run(report_path=None)
+    failed = False
+    with tempfile.TemporaryDirectory() as work_dir:
+        for name, (path, dtype, transform, build) in DATASETS.items():
+            path = head_csv(path, args.rows, work_dir)
+            key_map = {}
+            expected = batch_hashes(path, dtype, transform, build, key_map)
+            for chunksize in args.chunksizes:
+                try:
+                    actual = streaming_hashes(path, dtype, transform, build, key_map, chunksize)
+                except Exception as e:
+                    print(f"{name:<14}chunks of {chunksize:<6}ERROR {e!r}")
+                    failed = True
+                    continue
+
+                differ = [table for table in expected if actual.get(table) != expected[table]]
+                if differ:
+                    failed = True
+                    print(f"{name:<14}chunks of {chunksize:<6}{len(differ)} of {len(expected)} tables differ")
+                    for table in differ:
+                        print(f"    {table}: batch {expected[table][1]} rows, streaming {actual.get(table, (None, 0))[1]} rows")
+                else:
+                    print(f"{name:<14}chunks of {chunksize:<6}{len(expected)} tables match")
+
+    if failed:
+        print("\nStreaming tables do not match the batch tables.")
+        sys.exit(1)
+    print("\nStreaming tables match the batch tables.")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
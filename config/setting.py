@@ -1,3 +1,5 @@
+import os
+
 # Input File Path
 
 REQUIREMENTS_DATA_PATH = "data/data_requirements.csv"
@@ -7,6 +9,99 @@ WATCHES_DATA_PATH = "data/Watches.csv"
 
 OUTPUT_PATH_DIR = "warehouse/"
 
+# Output format of the warehouse files: "csv", "parquet" or "arrow" (Arrow IPC).
+# parquet/arrow need pyarrow and are written as one dataset directory per table
+OUTPUT_FORMAT = "csv"
+OUTPUT_COMPRESSION = "zstd"
+# parquet/arrow tables written as hive partitioned datasets, year/month come from date_id
+OUTPUT_PARTITIONS = {
+    "fact_requirements": ["year", "month"]
+    }
+
+# Streaming mode: rows per chunk read from the input files,
+# None reads and transforms each file as a whole
+CHUNK_SIZE = None
+
+# Optional watch brand list file (one brand per line), None uses watch_brand_list in utils/cleaning.py
+WATCH_BRAND_LIST_PATH = None
+
+# Print memory usage (memory_usage(deep=True)) of the transformed frames before and after the dtype plan
+DTYPE_MEMORY_REPORT = True
+
+# Data profiling: top values per text column, columns with more distinct values than PROFILE_EXACT_LIMIT
+# switch to approximate counts (HyperLogLog, count-min sketch). PROFILE_SAMPLE profiles only a fraction (0-1)
+# or a number of rows of every frame/chunk, None profiles everything. Profiles are saved as JSON in
+# PROFILE_OUTPUT_DIR and compared with the previous run
+PROFILE_TOP_K = 5
+PROFILE_EXACT_LIMIT = 10_000
+# no top values for near unique columns (distinct count >= PROFILE_UNIQUE_RATIO x non null count),
+# their top values are free text/urls counted once each
+PROFILE_UNIQUE_RATIO = 0.95
+PROFILE_SAMPLE = None
+PROFILE_OUTPUT_DIR = "warehouse/profiles/"
+
+# Calendar dimensions: dim_date covers this range (extended to the dates found in the data),
+# dim_time always has the 86,400 seconds of the day
+CALENDAR_START_DATE = "2024-01-01"
+CALENDAR_END_DATE = "2025-12-31"
+
+# Currency normalization: currency symbols found in salary_estimate and the watch prices, and the value of
+# one unit of each currency in BASE_CURRENCY (local rate table, update it when the rates move, a change
+# re-runs both datasets on the next run, see scripts/pipeline.py dataset_fingerprints).
+# Hourly salaries are annualized with ANNUAL_WORK_HOURS (40 hours x 52 weeks)
+BASE_CURRENCY = "USD"
+CURRENCY_SYMBOLS = {"$": "USD", "₹": "INR", "€": "EUR", "£": "GBP"}
+CURRENCY_RATES = {"USD": 1.0, "INR": 0.012, "EUR": 1.08, "GBP": 1.27}
+ANNUAL_WORK_HOURS = 2080
+
+# Persisted surrogate key map (natural value -> id) so ids stay stable across runs
+KEY_MAP_PATH = "warehouse/key_map.json"
+
+# Run-state manifest: input/code fingerprints of each dataset and content hash of each output table.
+# Unchanged datasets, table loads and file writes are skipped on the next run (main.py --force runs everything)
+RUN_STATE_PATH = "warehouse/run_state.json"
+
+# Cleaning cache: every cleaner runs once per distinct value, results are kept in a bounded LRU cache.
+# Set a path to persist the cache across runs (it is dropped when utils/cleaning.py changes)
+CLEANING_CACHE_SIZE = 100_000
+CLEANING_CACHE_PATH = None
+
+# Run report: every stage (extract, transform steps, loads, file writes) appends one JSON line with
+# its wall time, rows, rows/sec and peak RSS, None disables it. TRACE_MEMORY adds tracemalloc peaks (slower)
+RUN_REPORT_PATH = "warehouse/run_report.jsonl"
+# the report is rotated at the start of a run once it is larger than RUN_REPORT_MAX_BYTES
+# (run_report.jsonl.1 ... .RUN_REPORT_BACKUPS are kept), None lets it grow
+RUN_REPORT_MAX_BYTES = 10_000_000
+RUN_REPORT_BACKUPS = 3
+TRACE_MEMORY = False
+
+# Pipeline runner: the requirements and watches branches run in a process pool,
+# loads and CSV writes in a thread pool. PIPELINE_SERIAL runs everything one after the other (debugging)
+PIPELINE_WORKERS = min(4, os.cpu_count() or 1)
+PIPELINE_SERIAL = False
+
+# Load Settings
+
+# "full" truncates and reloads every table, "incremental" upserts dimensions
+# and appends only new fact_requirements rows
+LOAD_MODE = "full"
+
+# "copy" bulk loads with COPY ... FROM STDIN, "insert" uses the old df.to_sql path
+LOAD_METHOD = "copy"
+# rows rendered into one in-memory buffer per COPY call
+COPY_CHUNK_SIZE = 50_000
+
+# Full loads drop the secondary indexes of the loaded tables before the bulk load and rebuild them after it.
+# Every load session analyzes the loaded tables and refreshes the materialized views reading them
+LOAD_REBUILD_INDEXES = True
+LOAD_REFRESH_VIEWS = True
+
+# Schema migration: the first load session of a process checks the catalog and, when a column, index or view is
+# missing, runs SCHEMA_PATH (init.sql, idempotent) in its own transaction before loading, so a database
+# created by an older init.sql gets the columns, indexes and views added since
+LOAD_MIGRATE_SCHEMA = True
+SCHEMA_PATH = "init.sql"
+
 # DB Connection Settings
 DB_CONFIG = {
     "host": "localhost",
@@ -14,4 +109,5 @@ DB_CONFIG = {
     "database": "module1-capstone-project",
     "user": "rifqy_de",
     "password": "purwade12345"
-}
\ No newline at end of file
+}
+DB_POOL_SIZE = 5
\ No newline at end of file
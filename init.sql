@@ -1,4 +1,9 @@
-CREATE TABLE dim_company (
+-- Warehouse schema. Every statement is idempotent: the database container runs this file once on a new
+-- database, and the load (scripts/load.py, LOAD_MIGRATE_SCHEMA) runs it again before loading, so a database
+-- created by an older version gets the new columns, indexes and views. It can also be run by hand:
+--     psql -h localhost -p 5433 -U rifqy_de -d module1-capstone-project -f init.sql
+
+CREATE TABLE IF NOT EXISTS dim_company (
     company_id INT PRIMARY KEY,
     company VARCHAR(255),
     company_rating FLOAT,
@@ -14,7 +19,7 @@ CREATE TABLE dim_company (
     company_revenue_max FLOAT
 );
 
-CREATE TABLE dim_location (
+CREATE TABLE IF NOT EXISTS dim_location (
     location_id INT PRIMARY KEY,
     location VARCHAR(255),
     city VARCHAR(100),
@@ -23,32 +28,40 @@ CREATE TABLE dim_location (
     location_type VARCHAR(50)
 );
 
-CREATE TABLE dim_job_family (
+CREATE TABLE IF NOT EXISTS dim_job_family (
     job_family_id INT PRIMARY KEY,
     job_family VARCHAR(100)
 );
 
-CREATE TABLE dim_seniority (
+CREATE TABLE IF NOT EXISTS dim_seniority (
     seniority_level_id INT PRIMARY KEY,
     seniority_level VARCHAR(100)
 );
 
-CREATE TABLE dim_date (
+CREATE TABLE IF NOT EXISTS dim_date (
     date_id INT PRIMARY KEY,
     date DATE,
     day INT,
     month INT,
-    year INT
+    year INT,
+    weekday INT,
+    weekday_name VARCHAR(10),
+    quarter INT,
+    week INT,
+    is_weekend BOOLEAN
 );
 
-CREATE TABLE dim_time (
+CREATE TABLE IF NOT EXISTS dim_time (
     time_id INT PRIMARY KEY,
     time TIME,
+    hour INT,
+    minute INT,
+    second INT,
     UNIQUE (time)
 );
 
 
-CREATE TABLE fact_requirements (
+CREATE TABLE IF NOT EXISTS fact_requirements (
     requirement_id INT PRIMARY KEY,
     company_id INT,
     location_id INT,
@@ -60,6 +73,8 @@ CREATE TABLE fact_requirements (
     job_description TEXT,
     salary_amount FLOAT,
     salary_period VARCHAR(50),
+    salary_currency VARCHAR(10),
+    annual_salary FLOAT,
     CONSTRAINT fk_company FOREIGN KEY (company_id) REFERENCES dim_company(company_id),
     CONSTRAINT fk_location FOREIGN KEY (location_id) REFERENCES dim_location(location_id),
     CONSTRAINT fk_job_family FOREIGN KEY (job_family_id) REFERENCES dim_job_family(job_family_id),
@@ -68,7 +83,7 @@ CREATE TABLE fact_requirements (
     CONSTRAINT fk_time FOREIGN KEY (time_id) REFERENCES dim_time(time_id)
 );
 
-CREATE TABLE dim_products (
+CREATE TABLE IF NOT EXISTS dim_products (
     product_id INT PRIMARY KEY,
     name VARCHAR(255),
     brand_cleaned VARCHAR(100),
@@ -80,5 +95,78 @@ CREATE TABLE dim_products (
     no_of_ratings INT,
     actual_price FLOAT,
     discount_price FLOAT,
-    currency VARCHAR(10)
-)
\ No newline at end of file
+    currency VARCHAR(10),
+    actual_price_base FLOAT,
+    discount_price_base FLOAT
+);
+
+-- Columns added after the first version of the schema (no-ops on a database created by this file)
+ALTER TABLE dim_date
+    ADD COLUMN IF NOT EXISTS weekday INT,
+    ADD COLUMN IF NOT EXISTS weekday_name VARCHAR(10),
+    ADD COLUMN IF NOT EXISTS quarter INT,
+    ADD COLUMN IF NOT EXISTS week INT,
+    ADD COLUMN IF NOT EXISTS is_weekend BOOLEAN;
+
+ALTER TABLE dim_time
+    ADD COLUMN IF NOT EXISTS hour INT,
+    ADD COLUMN IF NOT EXISTS minute INT,
+    ADD COLUMN IF NOT EXISTS second INT;
+
+ALTER TABLE fact_requirements
+    ADD COLUMN IF NOT EXISTS salary_currency VARCHAR(10),
+    ADD COLUMN IF NOT EXISTS annual_salary FLOAT;
+
+ALTER TABLE dim_products
+    ADD COLUMN IF NOT EXISTS actual_price_base FLOAT,
+    ADD COLUMN IF NOT EXISTS discount_price_base FLOAT;
+
+-- Secondary indexes for the dashboard queries (scripts/star_schema.py), the full load drops them
+-- before the bulk load and rebuilds them after it
+CREATE INDEX IF NOT EXISTS idx_fact_requirements_company_id ON fact_requirements (company_id);
+CREATE INDEX IF NOT EXISTS idx_fact_requirements_location_id ON fact_requirements (location_id);
+CREATE INDEX IF NOT EXISTS idx_fact_requirements_job_family_id ON fact_requirements (job_family_id);
+CREATE INDEX IF NOT EXISTS idx_fact_requirements_seniority_level_id ON fact_requirements (seniority_level_id);
+CREATE INDEX IF NOT EXISTS idx_fact_requirements_date_id ON fact_requirements (date_id);
+CREATE INDEX IF NOT EXISTS idx_dim_products_brand_cleaned ON dim_products (brand_cleaned);
+CREATE INDEX IF NOT EXISTS idx_dim_products_main_category ON dim_products (main_category);
+
+-- Materialized aggregates, refreshed at the end of every load
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_salary_by_job_family_seniority_state AS
+SELECT
+    jf.job_family,
+    s.seniority_level,
+    l.state,
+    COUNT(*) AS postings,
+    COUNT(f.annual_salary) AS salary_postings,
+    AVG(f.annual_salary) AS avg_annual_salary,
+    PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY f.annual_salary) AS median_annual_salary,
+    MIN(f.annual_salary) AS min_annual_salary,
+    MAX(f.annual_salary) AS max_annual_salary
+FROM fact_requirements f
+JOIN dim_job_family jf ON jf.job_family_id = f.job_family_id
+JOIN dim_seniority s ON s.seniority_level_id = f.seniority_level_id
+JOIN dim_location l ON l.location_id = f.location_id
+GROUP BY jf.job_family, s.seniority_level, l.state;
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_postings_per_date AS
+SELECT
+    d.date_id,
+    d.date,
+    COUNT(*) AS postings
+FROM fact_requirements f
+JOIN dim_date d ON d.date_id = f.date_id
+GROUP BY d.date_id, d.date;
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_brand_stats AS
+SELECT
+    brand_cleaned,
+    COUNT(*) AS products,
+    AVG(ratings) AS avg_rating,
+    SUM(no_of_ratings) AS total_ratings,
+    AVG(actual_price_base) AS avg_actual_price_base,
+    MIN(actual_price_base) AS min_actual_price_base,
+    MAX(actual_price_base) AS max_actual_price_base,
+    AVG(discount_price_base) AS avg_discount_price_base
+FROM dim_products
+GROUP BY brand_cleaned
\ No newline at end of file
@@ -1,62 +1,69 @@
-from config.setting import REQUIREMENTS_DATA_PATH, WATCHES_DATA_PATH
-from scripts.extract import extract_csv
-from scripts.transform import transform_data_requirements, transform_data_watches
-from scripts.load import load_to_postgres, save_to_csv
-from utils.data_profile import data_demographi
-
-def main():
-    # Extract raw data_requirements csv data from input path
-    raw_requirements_df = extract_csv(REQUIREMENTS_DATA_PATH)
-
-    # Transform data
-    transformed_requirements = transform_data_requirements(raw_requirements_df)
-
-    # Data demographi/profiling
-    requirements_demographi = data_demographi(transformed_requirements, "job_description")
-
-    # Fact and dimensional tables
-    fact_requirements = transformed_requirements[["requirement_id", "company_id", "location_id", "job_family_id", "seniority_level_id", "date_id", "time_id", "job_title", "job_description", "salary_amount", "salary_period"]]
-    dim_company = transformed_requirements[["company_id", "company", "company_rating", "company_size", "company_size_min", "company_size_max", "company_type", "company_sector", "company_industry", "company_founded", "company_revenue", "company_revenue_min", "company_revenue_max"]].drop_duplicates(subset=["company_id"]).reset_index(drop=True)
-    dim_location = transformed_requirements[["location_id", "location", "city", "state", "country", "location_type"]].drop_duplicates(subset=["location_id"]).reset_index(drop=True)
-    dim_job_family = transformed_requirements[["job_family_id", "job_family"]].drop_duplicates(subset=["job_family_id"]).reset_index(drop=True)
-    dim_seniority = transformed_requirements[["seniority_level_id", "seniority_level"]].drop_duplicates(subset=["seniority_level_id"]).reset_index(drop=True)
-    dim_date = transformed_requirements[["date_id", "date", "day", "month", "year"]].drop_duplicates(subset=["date_id"]).reset_index(drop=True)
-    dim_time = transformed_requirements[["time_id", "time"]].drop_duplicates(subset=["time_id"]).reset_index(drop=True)
-
-    # Extract raw watches csv data from input path
-    raw_watches_df = extract_csv(WATCHES_DATA_PATH)
-
-    # Transform data
-    transformed_watches = transform_data_watches(raw_watches_df)
-
-    # Data demographi/profiling
-    watches_demographi = data_demographi(transformed_watches, ["image", "link"])
-
-    # Dimensional tables
-    dim_products = transformed_watches[["product_id", "name", "brand_cleaned", "main_category", "sub_category", "image", "link", "ratings", "no_of_ratings", "actual_price", "discount_price", "currency"]].drop_duplicates(subset=["product_id"]).reset_index(drop=True)
-
-    # Load data to database
-    load_to_postgres(dim_company, "dim_company")
-    load_to_postgres(dim_location, "dim_location")
-    load_to_postgres(dim_job_family, "dim_job_family")
-    load_to_postgres(dim_seniority, "dim_seniority")
-    load_to_postgres(dim_date, "dim_date")
-    load_to_postgres(dim_time, "dim_time")
-    load_to_postgres(fact_requirements, "fact_requirements")
-    load_to_postgres(dim_products, "dim_products")
-
-    # Save to CSV
-    save_to_csv(dim_company, "dim_company")
-    save_to_csv(dim_location, "dim_location")
-    save_to_csv(dim_job_family, "dim_job_family")
-    save_to_csv(dim_seniority, "dim_seniority")
-    save_to_csv(dim_date, "dim_date")
-    save_to_csv(dim_time, "dim_time")
-    save_to_csv(fact_requirements, "fact_requirements")
-    save_to_csv(dim_products, "dim_products")
-
-    print(requirements_demographi)
-    print(watches_demographi)
+import time
+
+# taken before anything else is imported, the startup time below includes every import of the CLI
+_START = time.perf_counter()
+
+import argparse
+from config.setting import CHUNK_SIZE, OUTPUT_FORMAT, PIPELINE_WORKERS, PIPELINE_SERIAL, LOAD_METHOD, LOAD_MODE
+
+# Command line: only the standard library and config are imported here, pandas and the pipeline modules
+# are imported once the arguments are parsed (--help stays instant) and SQLAlchemy only when PostgreSQL is a target
+
+DATASET_CHOICES = ["requirements", "watches"]
+TARGET_CHOICES = ["postgres", "csv", "both"]
+STAGE_CHOICES = ["transform", "profile", "load"]
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Job requirements and watches ETL pipeline")
+    parser.add_argument("--dataset", choices=DATASET_CHOICES + ["all"], nargs="+", default=["all"],
+                        help="datasets to process (default: all)")
+    parser.add_argument("--target", choices=TARGET_CHOICES, default="both",
+                        help="load to postgres, write the warehouse files (csv, or --format) or both (default: both)")
+    parser.add_argument("--stages", choices=STAGE_CHOICES, nargs="+", default=STAGE_CHOICES,
+                        help="stages to run, transform always runs (default: transform profile load)")
+    parser.add_argument("--format", choices=["csv", "parquet", "arrow"], default=OUTPUT_FORMAT,
+                        help=f"format of the warehouse files (default: {OUTPUT_FORMAT})")
+    parser.add_argument("--chunksize", type=int, default=CHUNK_SIZE,
+                        help="stream the inputs in chunks of this many rows, 0 for batch mode")
+    parser.add_argument("--mode", choices=["full", "incremental"], default=LOAD_MODE, help="postgres load mode")
+    parser.add_argument("--method", choices=["copy", "insert"], default=LOAD_METHOD, help="postgres load method")
+    parser.add_argument("--workers", type=int, default=PIPELINE_WORKERS, help="worker processes/threads of batch mode")
+    parser.add_argument("--serial", action="store_true", default=PIPELINE_SERIAL,
+                        help="run the batch branches one after the other")
+    parser.add_argument("--force", action="store_true",
+                        help="process, load and write everything even when the inputs did not change since the last run")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    datasets = DATASET_CHOICES if "all" in args.dataset else [name for name in DATASET_CHOICES if name in args.dataset]
+    output = "load" in args.stages
+    load = output and args.target in ("postgres", "both")
+    write = output and args.target in ("csv", "both")
+    profile = "profile" in args.stages
+
+    # heavy imports (pandas, numpy, the pipeline modules) only now that a run is needed
+    from scripts.pipeline import run_pipeline, run_streaming
+    from utils.instrument import stage, start_run, summarize_run
+
+    startup = time.perf_counter() - _START
+    print(f"Startup: {startup:.2f}s (datasets={','.join(datasets)}, target={args.target}, stages={','.join(args.stages)}).")
+
+    # every stage of this run is appended to the run report under the same run id
+    run_id = start_run()
+
+    options = dict(force=args.force, datasets=datasets, load=load, write=write, profile=profile, output_format=args.format)
+    with stage("pipeline", streaming=bool(args.chunksize), startup_seconds=round(startup, 3), target=args.target,
+               datasets=datasets):
+        # Streaming mode, files are processed chunk by chunk to keep memory bounded
+        if args.chunksize:
+            run_streaming(args.chunksize, method=args.method, mode=args.mode, **options)
+        else:
+            # Batch mode, the datasets are processed in parallel then loaded and saved to the warehouse files
+            run_pipeline(args.workers, args.serial, method=args.method, mode=args.mode, **options)
+
+    # slowest stages of the run
+    summarize_run(run_id)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
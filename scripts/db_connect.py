@@ -1,15 +1,25 @@
 from sqlalchemy import create_engine
-from config.setting import DB_CONFIG
+from config.setting import DB_CONFIG, DB_POOL_SIZE
+
+# one engine (and one connection pool) per process, created on first use
+_engine = None
 
 def get_db_connection():
     """
-    Database connection to PostgreSQL
+    Database connection to PostgreSQL.
+    The engine is created once and shared, so every load reuses the same connection pool
     """
+    global _engine
+    if _engine is not None:
+        return _engine
+
     host = DB_CONFIG["host"]
     port = DB_CONFIG["port"]
     database = DB_CONFIG["database"]
     user = DB_CONFIG["user"]
     password = DB_CONFIG["password"]
 
-    engine = create_engine(f"postgresql+psycopg2://{user}:{password}@{host}:{port}/{database}")
-    return engine
\ No newline at end of file
+    # pre ping so a connection dropped by the database between runs is replaced instead of failing the load
+    _engine = create_engine(f"postgresql+psycopg2://{user}:{password}@{host}:{port}/{database}",
+                            pool_size=DB_POOL_SIZE, pool_pre_ping=True)
+    return _engine
\ No newline at end of file
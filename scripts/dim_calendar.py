@@ -0,0 +1,76 @@
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+from config.setting import CALENDAR_START_DATE, CALENDAR_END_DATE
+
+# Conformed calendar dimensions, generated once instead of being sliced out of the fact rows:
+# dim_date has every day of the configured range (extended to the dates in the data),
+# dim_time every second of the day
+
+CALENDAR_TABLES = ["dim_date", "dim_time"]
+
+def date_key(dates):
+    """
+    date_id (yyyymmdd) of a datetime Series, computed arithmetically instead of strftime per row
+    """
+    return (dates.dt.year * 10000 + dates.dt.month * 100 + dates.dt.day).astype("int32")
+
+def time_key(dates):
+    """
+    time_id (hhmmss, leading zeros dropped like the old strftime("%H%M%S").astype(int)) of a datetime Series
+    """
+    return (dates.dt.hour * 10000 + dates.dt.minute * 100 + dates.dt.second).astype("int32")
+
+@lru_cache(maxsize=8)
+def build_dim_date(start_date, end_date):
+    """
+    One row per day from start_date to end_date (inclusive) with its calendar attributes.
+    The frame is cached, callers must not modify it
+    """
+    dates = pd.Series(pd.date_range(start_date, end_date, freq="D"))
+    iso = dates.dt.isocalendar()
+    return pd.DataFrame({
+        "date_id": date_key(dates),
+        "date": dates,
+        "day": dates.dt.day.astype("int8"),
+        "month": dates.dt.month.astype("int8"),
+        "year": dates.dt.year.astype("int16"),
+        # ISO weekday (1 = Monday) and ISO week number
+        "weekday": iso["day"].astype("int8"),
+        "weekday_name": dates.dt.day_name().astype("category"),
+        "quarter": dates.dt.quarter.astype("int8"),
+        "week": iso["week"].astype("int8"),
+        "is_weekend": (iso["day"] >= 6).astype(bool)
+        })
+
+@lru_cache(maxsize=1)
+def build_dim_time():
+    """
+    One row per second of the day (86,400 rows), time is the time since midnight.
+    The frame is cached, callers must not modify it
+    """
+    seconds = np.arange(86_400)
+    hour, minute, second = seconds // 3600, seconds // 60 % 60, seconds % 60
+    return pd.DataFrame({
+        "time_id": (hour * 10000 + minute * 100 + second).astype("int32"),
+        "time": pd.to_timedelta(seconds, unit="s"),
+        "hour": hour.astype("int8"),
+        "minute": minute.astype("int8"),
+        "second": second.astype("int8")
+        })
+
+def calendar_range(dates, start_date=CALENDAR_START_DATE, end_date=CALENDAR_END_DATE):
+    """
+    Configured calendar range, extended so every date of the data has its dim_date row
+    """
+    start, end = pd.Timestamp(start_date), pd.Timestamp(end_date)
+    days = dates.dropna().dt.tz_localize(None).dt.normalize() if dates.dt.tz is not None else dates.dropna().dt.normalize()
+    if len(days):
+        start, end = min(start, days.min()), max(end, days.max())
+    return start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")
+
+def build_calendar_tables(dates):
+    """
+    dim_date and dim_time for a (transformed) datetime Series
+    """
+    return {"dim_date": build_dim_date(*calendar_range(dates)), "dim_time": build_dim_time()}
\ No newline at end of file
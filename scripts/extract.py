@@ -1,8 +1,31 @@
 import pandas as pd
+from utils.instrument import stage
+
+def _instrumented_chunks(reader, path):
+    """
+    Yield the chunks of a chunked reader, each chunk read recorded as an extract stage
+    """
+    with reader:
+        while True:
+            with stage("extract", path=path) as record:
+                chunk = next(reader, None)
+                record["rows"] = 0 if chunk is None else len(chunk)
+            if chunk is None:
+                return
+            yield chunk
 
 # Input File Path
-def extract_csv(path):
+def extract_csv(path, chunksize=None, dtype=None):
     """
-    Extract data from csv file
+    Extract data from csv file.
+    With chunksize, returns an iterator of dataframes of chunksize rows instead of the whole file.
+    dtype fixes the dtype of some columns instead of inferring it, chunks infer their dtypes one by one
+    (a chunk where every value of a text column is a number or empty would come back as int64/float64)
     """
-    return pd.read_csv(path)
\ No newline at end of file
+    if chunksize:
+        return _instrumented_chunks(pd.read_csv(path, chunksize=chunksize, dtype=dtype), path)
+
+    with stage("extract", path=path) as record:
+        df = pd.read_csv(path, dtype=dtype)
+        record["rows"] = len(df)
+    return df
\ No newline at end of file
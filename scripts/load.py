@@ -1,32 +1,386 @@
+import io
 import os
-from config.setting import OUTPUT_PATH_DIR
-from scripts.db_connect import get_db_connection
-from sqlalchemy import text
+import shutil
+from contextlib import contextmanager
+import pandas as pd
+from config.setting import OUTPUT_PATH_DIR, COPY_CHUNK_SIZE, OUTPUT_FORMAT, OUTPUT_COMPRESSION, OUTPUT_PARTITIONS, LOAD_REBUILD_INDEXES, LOAD_REFRESH_VIEWS, LOAD_MIGRATE_SCHEMA, SCHEMA_PATH
+from scripts.star_schema import MATERIALIZED_VIEWS, STAR_SCHEMA, index_name
+from utils.instrument import stage
 
-#Connect Dataframe to PostgreSQL DB
-def load_to_postgres(df, table_name, if_exists="append"):
+# SQLAlchemy (and the database driver) is only imported by the functions that talk to PostgreSQL,
+# so runs that only write the warehouse files never import it
+
+# Star schema tables in foreign key order, dimensions referenced by fact_requirements
+# have to be loaded before it
+TABLE_LOAD_ORDER = list(STAR_SCHEMA)
+
+# Primary keys from init.sql, used as the conflict target of incremental (upsert) loads
+TABLE_PRIMARY_KEYS = {name: spec["primary_key"] for name, spec in STAR_SCHEMA.items()}
+
+# Fact tables are append only in incremental mode, existing rows are never updated
+APPEND_ONLY_TABLES = {name for name, spec in STAR_SCHEMA.items() if spec.get("fact")}
+
+LOAD_MODES = ("full", "incremental")
+
+# Output formats of the warehouse files and their file extension
+OUTPUT_FORMATS = {"csv": "csv", "parquet": "parquet", "arrow": "arrow"}
+
+
+# marker written for missing values in the COPY buffer, it has to be something
+# that can never be a real value so that empty strings stay empty strings
+COPY_NULL_MARKER = "\\N"
+
+def with_time_of_day(df):
     """
-    Load Dataframe to PostgreSQL database
+    Timedelta columns (time of day since midnight, like dim_time.time) are turned back into
+    time values so they are written as HH:MM:SS for the TIME column and the output files
     """
-    engine = get_db_connection()
-    
+    columns = df.select_dtypes(include="timedelta").columns
+    if len(columns) == 0:
+        return df
+    return df.assign(**{column: (pd.Timestamp(0) + df[column]).dt.time for column in columns})
+
+def _write_copy_buffer(df):
+    """
+    Serialize a dataframe slice into an in-memory CSV buffer for COPY
+    """
+    buffer = io.StringIO()
+    # nullable Int64 columns (company_founded, no_of_ratings) are written as plain integers
+    # and <NA> becomes the null marker, date and time objects are written in ISO format
+    # which PostgreSQL accepts for DATE and TIME columns
+    with_time_of_day(df).to_csv(buffer, index=False, header=False, na_rep=COPY_NULL_MARKER)
+    buffer.seek(0)
+    return buffer
+
+def copy_to_postgres(df, table_name, conn, chunk_size=COPY_CHUNK_SIZE):
+    """
+    Stream dataframe into PostgreSQL table with COPY ... FROM STDIN, chunk by chunk
+    """
+    columns = ", ".join(f'"{col}"' for col in df.columns)
+    copy_sql = f"COPY {table_name} ({columns}) FROM STDIN WITH (FORMAT csv, NULL '{COPY_NULL_MARKER}')"
+
+    # COPY is not part of SQLAlchemy API, so we go down to the psycopg2 cursor
+    cursor = conn.connection.cursor()
+    try:
+        # chunking keeps the buffer small for wide tables like fact_requirements
+        # (job_description column) instead of rendering the whole table as one string
+        for start in range(0, len(df), chunk_size):
+            buffer = _write_copy_buffer(df.iloc[start:start + chunk_size])
+            cursor.copy_expert(copy_sql, buffer)
+    finally:
+        cursor.close()
+
+def truncate_tables(conn, table_names):
+    """
+    Truncate the given tables in a single statement inside the current transaction
+    """
+    from sqlalchemy import text
+    conn.execute(text(f"TRUNCATE TABLE {', '.join(table_names)} RESTART IDENTITY CASCADE"))
+
+def upsert_to_postgres(df, table_name, conn):
+    """
+    Incremental load: COPY the dataframe into a temporary staging table, then merge it into the
+    target table with INSERT ... ON CONFLICT on the table primary key.
+    Dimensions are updated in place, append only tables (fact_requirements) only get new rows
+    """
+    from sqlalchemy import text
+
+    primary_key = TABLE_PRIMARY_KEYS[table_name]
+    staging_table = f"staging_{table_name}"
+    columns = ", ".join(f'"{col}"' for col in df.columns)
+
+    conn.execute(text(f"CREATE TEMPORARY TABLE {staging_table} (LIKE {table_name} INCLUDING DEFAULTS) ON COMMIT DROP"))
+    copy_to_postgres(df, staging_table, conn)
+
+    if table_name in APPEND_ONLY_TABLES:
+        conflict_action = "DO NOTHING"
+    else:
+        updates = ", ".join(f'"{col}" = EXCLUDED."{col}"' for col in df.columns if col != primary_key)
+        conflict_action = f"DO UPDATE SET {updates}" if updates else "DO NOTHING"
+
+    result = conn.execute(text(
+        f"INSERT INTO {table_name} ({columns}) SELECT {columns} FROM {staging_table} "
+        f"ON CONFLICT ({primary_key}) {conflict_action}"
+        ))
+    # dropped right away so the same table can be staged again in the same transaction (streaming chunks)
+    conn.execute(text(f"DROP TABLE {staging_table}"))
+    return result.rowcount
+
+# schema files already checked by this process (the migration only has to run once per process)
+_migrated_schemas = set()
+
+def missing_schema_objects(conn, schema=STAR_SCHEMA, views=MATERIALIZED_VIEWS):
+    """
+    Columns, secondary indexes and materialized views of the star schema missing from the database.
+    Only reads the catalog, no lock is taken on the tables
+    """
+    from sqlalchemy import text
+    columns = set(conn.execute(text(
+        "SELECT table_name, column_name FROM information_schema.columns WHERE table_schema = current_schema()")).fetchall())
+    indexes = set(conn.execute(text("SELECT indexname FROM pg_indexes WHERE schemaname = current_schema()")).scalars())
+    matviews = set(conn.execute(text("SELECT matviewname FROM pg_matviews WHERE schemaname = current_schema()")).scalars())
+
+    missing = [f"{table}.{column}" for table, spec in schema.items() for column in spec["columns"] if (table, column) not in columns]
+    missing += [index_name(table, column) for table, spec in schema.items() for column in spec.get("indexes", [])
+                if index_name(table, column) not in indexes]
+    missing += [view for view in views if view not in matviews]
+    return missing
+
+def migrate_schema(engine, schema_path=SCHEMA_PATH):
+    """
+    Bring a database created by an older init.sql up to date, once per process and before the load session.
+    The idempotent schema file (CREATE ... IF NOT EXISTS, ADD COLUMN IF NOT EXISTS) only runs, in its own
+    short transaction, when the catalog shows a missing column, index or view: ALTER TABLE takes an
+    ACCESS EXCLUSIVE lock even when the column exists, an up to date database is never locked by it
+    """
+    if schema_path in _migrated_schemas:
+        return
     with engine.connect() as conn:
-        conn.execute(text(f"TRUNCATE TABLE {table_name} RESTART IDENTITY CASCADE"))
-        conn.commit()
-    
-    df.to_sql(table_name, engine, if_exists=if_exists, index=False)
-    print(f"Data loaded to table {table_name} successfully (table truncated first).")
+        missing = missing_schema_objects(conn)
+    if missing:
+        with stage("load.migrate_schema", path=schema_path, missing=missing):
+            with engine.begin() as conn, open(schema_path, encoding="utf-8") as f:
+                conn.exec_driver_sql(f.read())
+        print(f"Database schema migrated with {schema_path}, added: {', '.join(missing)}.")
+    _migrated_schemas.add(schema_path)
+
+def drop_secondary_indexes(conn, table_names):
+    """
+    Drop the secondary indexes of the given tables (primary keys are kept), a bulk load into a table
+    without them is faster than maintaining every index row by row
+    """
+    from sqlalchemy import text
+
+    names = [index_name(table, column) for table in table_names for column in STAR_SCHEMA[table].get("indexes", [])]
+    if names:
+        conn.execute(text(f"DROP INDEX IF EXISTS {', '.join(names)}"))
+
+def create_secondary_indexes(conn, table_names):
+    """
+    (Re)build the secondary indexes of the given tables
+    """
+    from sqlalchemy import text
+
+    for table in table_names:
+        for column in STAR_SCHEMA[table].get("indexes", []):
+            with stage(f"load.index.{index_name(table, column)}"):
+                conn.execute(text(f"CREATE INDEX IF NOT EXISTS {index_name(table, column)} ON {table} ({column})"))
+
+def analyze_tables(conn, table_names):
+    """
+    Update the planner statistics of the loaded tables
+    """
+    from sqlalchemy import text
+
+    with stage("load.analyze", tables=len(table_names)):
+        conn.execute(text(f"ANALYZE {', '.join(table_names)}"))
 
-def save_to_csv(df, filename):
+def refresh_materialized_views(conn, table_names):
     """
-    Save dataframe to CSV in the config output directory
+    Refresh the materialized views reading any of the given tables.
+    Views missing from the database (created before they were added to init.sql) are skipped
     """
-    os.makedirs(OUTPUT_PATH_DIR, exist_ok=True)
-    
+    from sqlalchemy import text
+
+    existing = set(conn.execute(text("SELECT matviewname FROM pg_matviews")).scalars())
+    for view, sources in MATERIALIZED_VIEWS.items():
+        if not set(sources) & set(table_names):
+            continue
+        if view not in existing:
+            print(f"Materialized view {view} not found (see init.sql), refresh skipped.")
+            continue
+        with stage(f"load.refresh.{view}"):
+            conn.execute(text(f"REFRESH MATERIALIZED VIEW {view}"))
+
+@contextmanager
+def load_session(table_names=TABLE_LOAD_ORDER, mode="full", rebuild_indexes=LOAD_REBUILD_INDEXES, refresh_views=LOAD_REFRESH_VIEWS,
+                 migrate=LOAD_MIGRATE_SCHEMA):
+    """
+    Open one transaction on the shared engine and yield the connection.
+    With migrate the schema is checked first (and migrated with init.sql if needed, see migrate_schema),
+    once per process and outside of the load transaction.
+    In full mode the given tables are truncated first and their secondary indexes dropped
+    (rebuilt once everything is loaded), in incremental mode nothing is removed.
+    Before the commit the loaded tables are analyzed and the materialized views reading them refreshed.
+    Everything done through the connection is committed once when the block exits,
+    so readers never see a half truncated warehouse
+    """
+    if mode not in LOAD_MODES:
+        raise ValueError(f"Unknown load mode: {mode}")
+
+    from scripts.db_connect import get_db_connection
+    engine = get_db_connection()
+    rebuild_indexes = rebuild_indexes and mode == "full"
+    if migrate:
+        migrate_schema(engine)
+    with engine.begin() as conn:
+        if mode == "full":
+            truncate_tables(conn, table_names)
+        if rebuild_indexes:
+            drop_secondary_indexes(conn, table_names)
+
+        yield conn
+
+        if rebuild_indexes:
+            create_secondary_indexes(conn, table_names)
+        analyze_tables(conn, table_names)
+        if refresh_views:
+            refresh_materialized_views(conn, table_names)
+
+#Connect Dataframe to PostgreSQL DB
+def load_to_postgres(df, table_name, if_exists="append", method="copy", conn=None, mode="full"):
+    """
+    Load Dataframe to PostgreSQL database.
+    method="copy" bulk loads with COPY, method="insert" uses the old df.to_sql path.
+    mode="incremental" upserts on the primary key instead (always staged with COPY).
+    Without conn the table is loaded in its own transaction (truncated first in full mode),
+    with conn (from load_session) the table is loaded into that session
+    """
+    if method not in ("copy", "insert"):
+        raise ValueError(f"Unknown load method: {method}")
+
+    if conn is None:
+        with load_session([table_name], mode=mode) as session_conn:
+            load_to_postgres(df, table_name, if_exists=if_exists, method=method, conn=session_conn, mode=mode)
+        return
+
+    with stage(f"load.{table_name}", rows=len(df), method=method, mode=mode) as record:
+        if mode == "incremental":
+            affected = upsert_to_postgres(df, table_name, conn)
+            record["affected_rows"] = affected
+        elif method == "copy":
+            copy_to_postgres(df, table_name, conn)
+        else:
+            with_time_of_day(df).to_sql(table_name, conn, if_exists=if_exists, index=False)
+    elapsed = record["seconds"]
+
+    rows_per_sec = len(df) / elapsed if elapsed > 0 else float("inf")
+    summary = f"{len(df)} rows in {elapsed:.2f}s ({rows_per_sec:,.0f} rows/sec, method={method}, mode={mode})"
+    if mode == "incremental":
+        summary += f", {affected} rows inserted/updated"
+    print(f"Data loaded to table {table_name} successfully. {summary}.")
+
+def load_tables(tables, method="copy", mode="full"):
+    """
+    Load a dict of {table_name: dataframe} in one transaction, in foreign key order.
+    Full mode truncates the tables first, incremental mode upserts them
+    """
+    unknown = set(tables) - set(TABLE_LOAD_ORDER)
+    if unknown:
+        raise ValueError(f"Unknown warehouse tables: {sorted(unknown)}")
+
+    table_names = [name for name in TABLE_LOAD_ORDER if name in tables]
+    # the session stage also covers the truncate and the commit
+    with stage("load.session", rows=sum(len(tables[name]) for name in table_names), mode=mode):
+        with load_session(table_names, mode=mode) as conn:
+            for name in table_names:
+                load_to_postgres(tables[name], name, method=method, conn=conn, mode=mode)
+    print(f"Load session committed for {len(table_names)} tables ({mode} load).")
+
+def save_to_csv(df, filename, append=False, output_dir=OUTPUT_PATH_DIR):
+    """
+    Save dataframe to CSV in the config output directory.
+    With append=True the rows are added to the existing file without header (streaming chunks)
+    """
+    os.makedirs(output_dir, exist_ok=True)
+
     if not filename.endswith('.csv'):
         filename += '.csv'
-    
-    full_path = os.path.join(OUTPUT_PATH_DIR, filename)
-    
-    df.to_csv(full_path, index=False)
-    print(f"DataFrame saved to: {full_path}")
\ No newline at end of file
+
+    full_path = os.path.join(output_dir, filename)
+    df = with_time_of_day(df)
+
+    if append:
+        df.to_csv(full_path, mode="a", header=False, index=False)
+    else:
+        df.to_csv(full_path, index=False)
+    print(f"DataFrame saved to: {full_path}")
+
+def add_partition_columns(df, partition_cols):
+    """
+    Derive the year/month partition columns from date_id (yyyymmdd, same values as dim_date)
+    without touching the original dataframe
+    """
+    derived = {}
+    if "year" in partition_cols and "year" not in df.columns:
+        derived["year"] = df["date_id"] // 10000
+    if "month" in partition_cols and "month" not in df.columns:
+        derived["month"] = df["date_id"] // 100 % 100
+    return df.assign(**derived) if derived else df
+
+def to_arrow_table(df):
+    """
+    Convert dataframe to an Arrow table. Categorical columns (from the dtype plans) are dictionary encoded,
+    other text columns are plain strings, so every chunk of a table is written with the same schema
+    """
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(with_time_of_day(df), preserve_index=False)
+    for position, field in enumerate(table.schema):
+        column = table.column(position)
+        # a chunk where a text column is all empty would be written as null type,
+        # keep it a string so every file of the table has the same schema
+        if pa.types.is_null(field.type):
+            table = table.set_column(position, field.name, column.cast(pa.string()))
+        # the index width of a categorical follows its number of categories (int8, int16 ...),
+        # which differs from chunk to chunk, so every dictionary gets int32 indices and string values
+        elif pa.types.is_dictionary(field.type):
+            table = table.set_column(position, field.name, column.cast(pa.dictionary(pa.int32(), pa.string())))
+    return table
+
+def save_to_columnar(df, name, output_format="parquet", append=False, part=0, partition_cols=None, output_dir=OUTPUT_PATH_DIR, compression=OUTPUT_COMPRESSION):
+    """
+    Save dataframe as a Parquet or Arrow IPC dataset directory (output_dir/name/), compressed and with
+    dictionary encoded categorical columns. partition_cols writes a hive partitioned dataset
+    (e.g. year=2024/month=6/). append=True adds the part file of a streaming chunk next to the existing ones
+    """
+    try:
+        import pyarrow.dataset as ds
+    except ImportError as e:
+        raise ImportError(f"pyarrow is required for {output_format} output, install it with: pip install -r requirements.txt") from e
+
+    dataset_dir = os.path.join(output_dir, name)
+    if not append and os.path.exists(dataset_dir):
+        shutil.rmtree(dataset_dir)
+
+    if partition_cols:
+        df = add_partition_columns(df, partition_cols)
+
+    if output_format == "parquet":
+        file_format = ds.ParquetFileFormat()
+    else:
+        file_format = ds.IpcFileFormat()
+
+    ds.write_dataset(
+        to_arrow_table(df),
+        dataset_dir,
+        format=file_format,
+        file_options=file_format.make_write_options(compression=compression),
+        partitioning=partition_cols or None,
+        partitioning_flavor="hive" if partition_cols else None,
+        basename_template=f"part-{part:05d}-{{i}}.{OUTPUT_FORMATS[output_format]}",
+        existing_data_behavior="overwrite_or_ignore"
+        )
+    print(f"DataFrame saved to: {dataset_dir} ({output_format})")
+
+def table_output_path(name, output_format=OUTPUT_FORMAT, output_dir=OUTPUT_PATH_DIR):
+    """
+    Path of a saved warehouse table: the csv file, or the parquet/arrow dataset directory
+    """
+    if output_format == "csv":
+        return os.path.join(output_dir, f"{name}.csv")
+    return os.path.join(output_dir, name)
+
+def save_table(df, name, output_format=OUTPUT_FORMAT, append=False, part=0, output_dir=OUTPUT_PATH_DIR):
+    """
+    Save a warehouse table in the configured output format (csv, parquet or arrow)
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format: {output_format}")
+
+    with stage(f"write.{name}", rows=len(df), format=output_format):
+        if output_format == "csv":
+            save_to_csv(df, name, append=append, output_dir=output_dir)
+        else:
+            save_to_columnar(df, name, output_format, append=append, part=part,
+                             partition_cols=OUTPUT_PARTITIONS.get(name), output_dir=output_dir)
\ No newline at end of file
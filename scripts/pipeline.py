@@ -0,0 +1,378 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import nullcontext
+from functools import partial
+from config.setting import REQUIREMENTS_DATA_PATH, WATCHES_DATA_PATH, WATCH_BRAND_LIST_PATH, OUTPUT_FORMAT, LOAD_METHOD, LOAD_MODE, KEY_MAP_PATH, CLEANING_CACHE_PATH, PIPELINE_WORKERS, PIPELINE_SERIAL, PROFILE_SAMPLE, RUN_STATE_PATH, CALENDAR_START_DATE, CALENDAR_END_DATE, OUTPUT_COMPRESSION, OUTPUT_PARTITIONS, BASE_CURRENCY, CURRENCY_SYMBOLS, CURRENCY_RATES, ANNUAL_WORK_HOURS
+from scripts.dim_calendar import build_calendar_tables
+from scripts.extract import extract_csv
+from scripts.transform import REQUIREMENTS_RAW_DTYPES, WATCHES_RAW_DTYPES, transform_data_requirements, transform_data_watches
+from scripts.star_schema import STAR_SCHEMA, build_star_schema, dataset_tables, dimension_keys
+from scripts.load import TABLE_LOAD_ORDER, load_session, load_tables, load_to_postgres, save_table, table_output_path
+from utils.cleaning import build_brand_matcher
+from utils.cleaning_cache import CleaningCache
+from utils.data_profile import DataProfiler, data_demographi, store_profile
+from utils.instrument import stage
+from utils.key_map import load_key_map, save_key_map
+from utils.run_state import RunState, TableHash, dataset_fingerprint, settings_hash, table_hash
+
+# Tables produced by each dataset (star schema specs in scripts/star_schema.py)
+DATASET_TABLES = {dataset: dataset_tables(dataset) for dataset in ("requirements", "watches")}
+
+# Surrogate key of every dimension table, dimension rows are deduplicated on it
+DIMENSION_KEYS = dimension_keys()
+
+# Columns profiled without top values, their values are too long (free text, urls) to be useful as top values
+PROFILE_EXCLUDE_COLUMNS = {"requirements": ["job_description"], "watches": ["image", "link"]}
+
+# Dimensions referenced by fact_requirements: truncating one of them (full load) empties the fact table too
+FACT_DIMENSION_TABLES = STAR_SCHEMA["fact_requirements"]["references"]
+
+def build_requirements_tables(df):
+    """
+    Fact and dimensional tables of the requirements dataset, dim_date and dim_time
+    come from the precomputed calendar (covering every date of df)
+    """
+    return {**build_star_schema(df, "requirements"), **build_calendar_tables(df["dates"])}
+
+def build_watches_tables(df):
+    """
+    Dimensional tables of the watches dataset
+    """
+    return build_star_schema(df, "watches")
+
+def process_requirements(profile=True):
+    """
+    Requirements branch: extract, transform, profile and slice the star schema tables.
+    Returns (tables, (dataset name, profile or None), cleaning cache, updated key map).
+    The key map is not saved here, only once the tables are loaded (see run_pipeline)
+    """
+    # Cleaners run once per distinct value (the cache is loaded from disk if configured)
+    cache = CleaningCache(path=CLEANING_CACHE_PATH)
+
+    # Extract raw data_requirements csv data from input path
+    raw_requirements_df = extract_csv(REQUIREMENTS_DATA_PATH, dtype=REQUIREMENTS_RAW_DTYPES)
+
+    # Transform data, surrogate ids come from the persisted key map so they are stable across runs
+    key_map = load_key_map(KEY_MAP_PATH)
+    transformed_requirements = transform_data_requirements(raw_requirements_df, key_map, cache)
+
+    # Data demographi/profiling
+    requirements_demographi = None
+    if profile:
+        with stage("profile.requirements", rows=len(transformed_requirements)):
+            requirements_demographi = data_demographi(transformed_requirements, PROFILE_EXCLUDE_COLUMNS["requirements"], sample=PROFILE_SAMPLE)
+
+    # Fact and dimensional tables
+    return build_requirements_tables(transformed_requirements), ("requirements", requirements_demographi), cache, key_map
+
+def process_watches(profile=True):
+    """
+    Watches branch: extract, transform, profile and slice the dimension table.
+    Returns (tables, (dataset name, profile or None), cleaning cache, None) like process_requirements
+    """
+    cache = CleaningCache(path=CLEANING_CACHE_PATH)
+
+    # Extract raw watches csv data from input path
+    raw_watches_df = extract_csv(WATCHES_DATA_PATH, dtype=WATCHES_RAW_DTYPES)
+
+    # Transform data
+    transformed_watches = transform_data_watches(raw_watches_df, cache)
+
+    # Data demographi/profiling
+    watches_demographi = None
+    if profile:
+        with stage("profile.watches", rows=len(transformed_watches)):
+            watches_demographi = data_demographi(transformed_watches, PROFILE_EXCLUDE_COLUMNS["watches"], sample=PROFILE_SAMPLE)
+
+    # Dimensional tables
+    return build_watches_tables(transformed_watches), ("watches", watches_demographi), cache, None
+
+# Batch branch of each dataset
+DATASET_BRANCHES = {
+    "requirements": process_requirements,
+    "watches": process_watches
+    }
+
+DATASETS = list(DATASET_BRANCHES)
+
+def report_profile(name, profile):
+    """
+    Print a dataset profile, store it and print what changed since the previous run
+    """
+    print(f"\nData demographi of {name}:")
+    print(json.dumps(profile, indent=2, ensure_ascii=False))
+
+    changes = store_profile(profile, name)
+    if changes:
+        print(f"Profile changes of {name} since the previous run:")
+        print(json.dumps(changes, indent=2, ensure_ascii=False))
+    elif changes is not None:
+        print(f"Profile of {name} unchanged since the previous run.")
+
+def run_branches(branches, workers, serial):
+    """
+    Run independent dataset branches, in a process pool or one after the other when serial
+    """
+    if serial or workers < 2 or len(branches) < 2:
+        return [branch() for branch in branches]
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(branches))) as pool:
+        futures = [pool.submit(branch) for branch in branches]
+        return [future.result() for future in futures]
+
+def dataset_fingerprints(datasets=DATASETS):
+    """
+    Input fingerprint of each dataset: input file, transform code, the settings its tables depend on
+    (calendar range, currency rate table) and, for watches, the brand list
+    """
+    # salaries and prices are converted with the rate table, a rate change has to reload both datasets
+    currency = settings_hash({"base": BASE_CURRENCY, "symbols": CURRENCY_SYMBOLS, "rates": CURRENCY_RATES, "annual_work_hours": ANNUAL_WORK_HOURS})
+    fingerprints = {}
+    if "requirements" in datasets:
+        fingerprints["requirements"] = dataset_fingerprint(REQUIREMENTS_DATA_PATH, calendar=[CALENDAR_START_DATE, CALENDAR_END_DATE], currency=currency)
+    if "watches" in datasets:
+        fingerprints["watches"] = dataset_fingerprint(WATCHES_DATA_PATH, brand_list=build_brand_matcher(WATCH_BRAND_LIST_PATH).fingerprint, currency=currency)
+    return fingerprints
+
+def file_output(output_format=OUTPUT_FORMAT):
+    """
+    Name of the warehouse files output in the run-state manifest. Parquet/Arrow files also depend on
+    OUTPUT_COMPRESSION and OUTPUT_PARTITIONS, their hash is part of the name so files written
+    with other settings are not taken as up to date
+    """
+    if output_format == "csv":
+        return output_format
+    return f"{output_format}:{settings_hash({'compression': OUTPUT_COMPRESSION, 'partitions': OUTPUT_PARTITIONS})}"
+
+def run_outputs(load=True, write=True, output_format=OUTPUT_FORMAT):
+    """
+    Outputs of a run as named in the run-state manifest: "postgres" and/or the warehouse files output
+    """
+    return (["postgres"] if load else []) + ([file_output(output_format)] if write else [])
+
+def datasets_to_run(state, fingerprints, outputs, force=False, output_format=OUTPUT_FORMAT):
+    """
+    Datasets whose inputs changed since they were last loaded/written to the outputs of this run
+    (or whose output files are missing), all of them with force.
+    A run without outputs (transform/profile only) always runs
+    """
+    selected = []
+    for name, fingerprint in fingerprints.items():
+        files_present = file_output(output_format) not in outputs or all(
+            os.path.exists(table_output_path(table, output_format)) for table in DATASET_TABLES[name])
+        if force or not outputs or not (state.dataset_unchanged(name, fingerprint, outputs) and files_present):
+            selected.append(name)
+        else:
+            print(f"Dataset {name} unchanged since the last run, skipped.")
+    return selected
+
+def tables_to_load(tables, hashes, state, mode, force=False):
+    """
+    Tables whose content differs from what was last loaded to PostgreSQL. In full mode fact_requirements
+    is reloaded whenever one of its dimensions is, the TRUNCATE ... CASCADE of the dimension empties it
+    """
+    selected = {name for name in tables if force or not state.table_unchanged(name, hashes[name], "postgres")}
+    if mode == "full" and "fact_requirements" in tables and selected & set(FACT_DIMENSION_TABLES):
+        selected.add("fact_requirements")
+    return [name for name in tables if name in selected]
+
+def tables_to_write(tables, hashes, state, force=False, output_format=OUTPUT_FORMAT):
+    """
+    Tables whose content differs from the saved warehouse file (or whose file is missing)
+    """
+    return [
+        name for name in tables
+        if force or not (state.table_unchanged(name, hashes[name], file_output(output_format)) and os.path.exists(table_output_path(name, output_format)))
+        ]
+
+def run_pipeline(workers=PIPELINE_WORKERS, serial=PIPELINE_SERIAL, method=LOAD_METHOD, mode=LOAD_MODE, force=False,
+                 datasets=DATASETS, load=True, write=True, profile=True, output_format=OUTPUT_FORMAT):
+    """
+    Batch pipeline runner. The requirements and watches branches are independent, so they run
+    concurrently in worker processes. Their tables are then loaded and written to the warehouse files concurrently:
+    the database load stays one transaction in foreign key order (fact_requirements after its dimensions)
+    and runs on one thread while the output files are written by the others.
+    datasets selects the branches, load/write/profile the stages (load=False never connects to PostgreSQL).
+    Datasets, table loads and file writes whose inputs did not change since the last run (run-state manifest)
+    are skipped, force runs everything
+    """
+    state = RunState(RUN_STATE_PATH)
+    outputs = run_outputs(load, write, output_format)
+    fingerprints = dataset_fingerprints(datasets)
+    selected = datasets_to_run(state, fingerprints, outputs, force, output_format)
+    if not selected:
+        print("Inputs unchanged since the last run, nothing to do (use --force to run anyway).")
+        return
+
+    results = run_branches([partial(DATASET_BRANCHES[name], profile=profile) for name in selected], workers, serial)
+
+    tables = {}
+    demographics = []
+    key_maps = []
+    cache = CleaningCache(path=CLEANING_CACHE_PATH)
+    for branch_tables, demographi, branch_cache, key_map in results:
+        tables.update(branch_tables)
+        demographics.append(demographi)
+        cache.merge(branch_cache)
+        if key_map is not None:
+            key_maps.append(key_map)
+
+    # Cleaning cache hit/miss statistics
+    cache.save()
+    cache.report()
+
+    # tables identical to the ones already loaded/written are not loaded/written again
+    hashes = {name: table_hash(table) for name, table in tables.items()}
+    load_names = tables_to_load(tables, hashes, state, mode, force) if load else []
+    write_names = tables_to_write(tables, hashes, state, force, output_format) if write else []
+    for name in tables:
+        skipped = [action for action, enabled, names in (("load", load, load_names), ("write", write, write_names))
+                   if enabled and name not in names]
+        if skipped:
+            print(f"Table {name} unchanged since the last run, {' and '.join(skipped)} skipped.")
+    load_set = {name: tables[name] for name in load_names}
+
+    if serial or workers < 2:
+        if load_set:
+            load_tables(load_set, method=method, mode=mode)
+        for name in write_names:
+            save_table(tables[name], name, output_format=output_format)
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(load_tables, load_set, method=method, mode=mode)] if load_set else []
+            futures += [pool.submit(save_table, tables[name], name, output_format=output_format) for name in write_names]
+            for future in futures:
+                future.result()
+
+    # everything succeeded, remember what is now in the database and the warehouse files.
+    # the key map is only saved now, a failed (rolled back) load must not keep ids that were never loaded
+    if outputs:
+        for key_map in key_maps:
+            save_key_map(key_map, KEY_MAP_PATH)
+        for name, table in tables.items():
+            state.record_table(name, hashes[name], len(table), outputs)
+        for name in selected:
+            state.record_dataset(name, fingerprints[name], outputs)
+        state.save()
+
+    for name, demographi in demographics:
+        if demographi is not None:
+            report_profile(name, demographi)
+
+def drop_seen_dimension_rows(tables, seen_keys):
+    """
+    Remove dimension rows whose key was already emitted by a previous chunk,
+    and remember the keys of the new ones (seen_keys is updated in place)
+    """
+    for name, df in tables.items():
+        key = DIMENSION_KEYS.get(name)
+        if key is None:
+            continue
+
+        seen = seen_keys.setdefault(name, set())
+        new_rows = df[~df[key].isin(seen)].reset_index(drop=True)
+        seen.update(new_rows[key].tolist())
+        tables[name] = new_rows
+    return tables
+
+def stream_dataset(path, transform, build, chunksize, conn=None, method=LOAD_METHOD, mode=LOAD_MODE, write_output=True, profiler=None, table_hashes=None,
+                   output_format=OUTPUT_FORMAT, dtype=None):
+    """
+    Extract, transform and load one csv file chunk by chunk.
+    Every chunk is loaded (and appended to the warehouse files) as soon as it is transformed,
+    so peak memory depends on the chunk size and not on the file size.
+    Dimension rows are deduplicated across chunks, only keys not seen before are loaded.
+    The profiler (DataProfiler), if given, is updated with every transformed chunk,
+    table_hashes ({table name: TableHash}), if given, with every emitted table chunk.
+    dtype is passed to the csv reader (the raw dtypes of the dataset), chunks do not infer their own
+    """
+    seen_keys = {}
+    row_count = 0
+
+    for chunk_number, chunk in enumerate(extract_csv(path, chunksize=chunksize, dtype=dtype)):
+        transformed = transform(chunk)
+        if profiler is not None:
+            with stage("profile.chunk", rows=len(transformed), path=path):
+                profiler.update(transformed)
+        tables = drop_seen_dimension_rows(build(transformed), seen_keys)
+        row_count += len(chunk)
+
+        # dimensions before facts, so the foreign keys of the chunk already exist
+        for name in TABLE_LOAD_ORDER:
+            if name not in tables:
+                continue
+
+            table = tables[name]
+            if table_hashes is not None:
+                table_hashes.setdefault(name, TableHash()).update(table)
+            if conn is not None and len(table):
+                load_to_postgres(table, name, method=method, conn=conn, mode=mode)
+            # first chunk (re)creates the output, the next ones append to it
+            if write_output and (chunk_number == 0 or len(table)):
+                save_table(table, name, output_format=output_format, append=chunk_number > 0, part=chunk_number)
+
+        print(f"Chunk {chunk_number + 1} of {path} processed ({row_count} rows so far).")
+
+    return row_count
+
+def run_streaming(chunksize, method=LOAD_METHOD, mode=LOAD_MODE, force=False,
+                  datasets=DATASETS, load=True, write=True, profile=True, output_format=OUTPUT_FORMAT):
+    """
+    Streaming version of the pipeline: the datasets are processed in chunks of chunksize rows
+    and loaded in one load session (one transaction), without a load session when load=False.
+    The profiles are built chunk by chunk, approximate counts keep their memory bounded.
+    A dataset whose inputs did not change since the last run is skipped (its tables are not truncated),
+    table contents are only known after the last chunk so changed datasets are reloaded as a whole
+    """
+    state = RunState(RUN_STATE_PATH)
+    outputs = run_outputs(load, write, output_format)
+    fingerprints = dataset_fingerprints(datasets)
+    selected = datasets_to_run(state, fingerprints, outputs, force, output_format)
+    if not selected:
+        print("Inputs unchanged since the last run, nothing to do (use --force to run anyway).")
+        return
+
+    key_map = load_key_map(KEY_MAP_PATH)
+    # one cache for every chunk, values seen in earlier chunks are not cleaned again
+    cache = CleaningCache(path=CLEANING_CACHE_PATH)
+
+    def transform_requirements(chunk):
+        return transform_data_requirements(chunk, key_map, cache)
+
+    def transform_watches(chunk):
+        return transform_data_watches(chunk, cache)
+
+    branches = {
+        "requirements": (REQUIREMENTS_DATA_PATH, transform_requirements, build_requirements_tables, REQUIREMENTS_RAW_DTYPES),
+        "watches": (WATCHES_DATA_PATH, transform_watches, build_watches_tables, WATCHES_RAW_DTYPES)
+        }
+    profilers = {name: DataProfiler(PROFILE_EXCLUDE_COLUMNS[name], sample=PROFILE_SAMPLE) for name in selected} if profile else {}
+    table_hashes = {}
+    table_names = [name for name in TABLE_LOAD_ORDER if any(name in DATASET_TABLES[dataset] for dataset in selected)]
+
+    # the whole streaming session (every chunk of the files, up to the commit) is one stage
+    with stage("streaming.session", mode=mode, load=load) as record, \
+            (load_session(table_names, mode=mode) if load else nullcontext()) as conn:
+        record["rows"] = 0
+        for name in selected:
+            path, transform, build, dtype = branches[name]
+            record["rows"] += stream_dataset(path, transform, build, chunksize, conn, method, mode, write_output=write,
+                                             profiler=profilers.get(name), table_hashes=table_hashes, output_format=output_format, dtype=dtype)
+
+    cache.save()
+    cache.report()
+    if load:
+        print(f"Streaming load session committed ({mode} load).")
+
+    # same as the batch runner, the key map is only saved once the load session committed
+    if outputs:
+        save_key_map(key_map, KEY_MAP_PATH)
+        for name, table in table_hashes.items():
+            state.record_table(name, table.hexdigest(), table.rows, outputs)
+        for name in selected:
+            state.record_dataset(name, fingerprints[name], outputs)
+        state.save()
+
+    for name, profiler in profilers.items():
+        report_profile(name, profiler.result())
\ No newline at end of file
@@ -0,0 +1,131 @@
+import numpy as np
+import pandas as pd
+
+# Star schema of init.sql, in foreign key order (dimensions referenced by fact_requirements first).
+# Every table has its columns, primary key, the dataset it is built from and its secondary indexes
+# (dropped before a full bulk load and rebuilt after it, see scripts/load.py).
+# Dimension rows are deduplicated on the primary key, fact tables have one row per transformed row
+# and list the dimensions they reference. Calendar tables are generated (scripts/dim_calendar.py)
+# instead of being sliced out of the transformed frame
+STAR_SCHEMA = {
+    "dim_company": {
+        "dataset": "requirements",
+        "primary_key": "company_id",
+        "columns": ["company_id", "company", "company_rating", "company_size", "company_size_min", "company_size_max", "company_type", "company_sector", "company_industry", "company_founded", "company_revenue", "company_revenue_min", "company_revenue_max"]
+        },
+    "dim_location": {
+        "dataset": "requirements",
+        "primary_key": "location_id",
+        "columns": ["location_id", "location", "city", "state", "country", "location_type"]
+        },
+    "dim_job_family": {
+        "dataset": "requirements",
+        "primary_key": "job_family_id",
+        "columns": ["job_family_id", "job_family"]
+        },
+    "dim_seniority": {
+        "dataset": "requirements",
+        "primary_key": "seniority_level_id",
+        "columns": ["seniority_level_id", "seniority_level"]
+        },
+    "dim_date": {
+        "dataset": "requirements",
+        "primary_key": "date_id",
+        "columns": ["date_id", "date", "day", "month", "year", "weekday", "weekday_name", "quarter", "week", "is_weekend"],
+        "calendar": True
+        },
+    "dim_time": {
+        "dataset": "requirements",
+        "primary_key": "time_id",
+        "columns": ["time_id", "time", "hour", "minute", "second"],
+        "calendar": True
+        },
+    "fact_requirements": {
+        "dataset": "requirements",
+        "primary_key": "requirement_id",
+        "columns": ["requirement_id", "company_id", "location_id", "job_family_id", "seniority_level_id", "date_id", "time_id", "job_title", "job_description", "salary_amount", "salary_period", "salary_currency", "annual_salary"],
+        "fact": True,
+        "references": ["dim_company", "dim_location", "dim_job_family", "dim_seniority", "dim_date", "dim_time"],
+        "indexes": ["company_id", "location_id", "job_family_id", "seniority_level_id", "date_id"]
+        },
+    "dim_products": {
+        "dataset": "watches",
+        "primary_key": "product_id",
+        "columns": ["product_id", "name", "brand_cleaned", "main_category", "sub_category", "image", "link", "ratings", "no_of_ratings", "actual_price", "discount_price", "currency", "actual_price_base", "discount_price_base"],
+        "indexes": ["brand_cleaned", "main_category"]
+        }
+    }
+
+# Materialized views of init.sql (common dashboard aggregates) and the tables they read,
+# a view is refreshed at the end of every load session that loaded one of its tables
+MATERIALIZED_VIEWS = {
+    "mv_salary_by_job_family_seniority_state": ["fact_requirements", "dim_job_family", "dim_seniority", "dim_location"],
+    "mv_postings_per_date": ["fact_requirements", "dim_date"],
+    "mv_brand_stats": ["dim_products"]
+    }
+
+def dataset_tables(dataset, schema=STAR_SCHEMA):
+    """
+    Names of the tables built from a dataset, in foreign key order
+    """
+    return [name for name, spec in schema.items() if spec["dataset"] == dataset]
+
+def dimension_keys(schema=STAR_SCHEMA):
+    """
+    Surrogate key of every dimension table, dimension rows are deduplicated on it
+    """
+    return {name: spec["primary_key"] for name, spec in schema.items() if not spec.get("fact")}
+
+def index_name(table, column):
+    """
+    Name of the secondary index of a table column (same as init.sql)
+    """
+    return f"idx_{table}_{column}"
+
+def first_positions(df, keys):
+    """
+    Row positions of the first occurrence of every value of each key column, in row order.
+    Only the key columns are scanned, a key shared by several tables is scanned once
+    """
+    positions = {}
+    for key in dict.fromkeys(keys):
+        positions[key] = np.flatnonzero(~df[key].duplicated().to_numpy())
+    return positions
+
+def table_view(df, columns):
+    """
+    Table made of columns of df without copying them
+    """
+    return pd.DataFrame({column: df[column] for column in columns}, copy=False)
+
+def build_star_schema(df, dataset, schema=STAR_SCHEMA):
+    """
+    Fact and dimension tables of a dataset sliced out of its transformed dataframe.
+    Dimensions take only their first-occurrence rows (same rows and order as drop_duplicates on the key),
+    so only the unique rows of their columns are copied, and nothing when every key is unique.
+    Fact tables share the columns of df (job_description is the widest one) instead of copying them.
+    The tables must be treated as read only
+    """
+    specs = {name: spec for name, spec in schema.items() if spec["dataset"] == dataset and not spec.get("calendar")}
+    positions = first_positions(df, [spec["primary_key"] for spec in specs.values() if not spec.get("fact")])
+
+    tables = {}
+    for name, spec in specs.items():
+        if spec.get("fact"):
+            tables[name] = table_view(df, spec["columns"])
+            continue
+
+        rows = positions[spec["primary_key"]]
+        if len(rows) == len(df):
+            table = table_view(df, spec["columns"])
+        else:
+            columns = df.columns.get_indexer(spec["columns"])
+            # get_indexer gives -1 for a missing column, which iloc would read as the last column
+            if (columns < 0).any():
+                missing = [column for column, position in zip(spec["columns"], columns) if position < 0]
+                raise KeyError(f"{missing} not in the transformed {dataset} columns (table {name})")
+            table = df.iloc[rows, columns]
+        # new index set in place, reset_index would copy the table once more
+        table.index = pd.RangeIndex(len(table))
+        tables[name] = table
+    return tables
\ No newline at end of file
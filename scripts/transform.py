@@ -1,139 +1,239 @@
 import pandas as pd
 import numpy as np
 import re
-from utils.cleaning import company_case_logic, normalize_location, detect_job_family, classify_seniority, split_revenue, clean_brand
+from config.setting import WATCH_BRAND_LIST_PATH, DTYPE_MEMORY_REPORT
+from scripts.dim_calendar import date_key, time_key
+from utils.cleaning import company_case_logic, normalize_location_vectorized, detect_job_family, classify_seniority_vectorized, split_revenue_vectorized, build_brand_matcher
+from utils.cleaning_cache import CleaningCache
+from utils.dtype_plan import apply_dtype_plan
+from utils.instrument import stage
+from utils.key_map import assign_surrogate_keys
+from utils.numeric_parsing import parse_price, parse_salary
+
+# Raw columns the transforms treat as text (.str calls, regex parsing), read as str by the pipeline (extract_csv dtype)
+# so every chunk of the streaming mode has the same dtypes as the whole file. Missing values stay NaN
+REQUIREMENTS_RAW_DTYPES = dict.fromkeys(["company", "location", "job_title", "job_description", "salary_estimate", "company_size",
+                                         "company_type", "company_sector", "company_industry", "company_revenue", "dates"], str)
+
+WATCHES_RAW_DTYPES = dict.fromkeys(["name", "main_category", "sub_category", "image", "link", "ratings", "no_of_ratings",
+                                    "discount_price", "actual_price"], str)
+
+# Dtype plans applied at the end of each transform: categoricals for low cardinality strings,
+# downcast integers for ids (int32 ids leave room for 2 billion rows/values)
+REQUIREMENTS_DTYPE_PLAN = {
+    "requirement_id": "int32",
+    "company_id": "int32",
+    "location_id": "int32",
+    "job_family_id": "int32",
+    "seniority_level_id": "int32",
+    "date_id": "int32",
+    "time_id": "int32",
+    "location": "category",
+    "company_size": "category",
+    "company_type": "category",
+    "company_sector": "category",
+    "company_industry": "category",
+    "company_revenue": "category",
+    "city": "category",
+    "state": "category",
+    "country": "category",
+    "location_type": "category",
+    "job_family": "category",
+    "seniority_level": "category",
+    "salary_period": "category",
+    "salary_currency": "category"
+    }
+
+WATCHES_DTYPE_PLAN = {
+    "product_id": "int32",
+    "brand_cleaned": "category",
+    "main_category": "category",
+    "sub_category": "category",
+    "currency": "category"
+    }
+
+def as_text_columns(df, dtypes):
+    """
+    Cast the raw text columns that are not strings (a frame read without the raw dtypes or built in memory)
+    to str, missing values stay NaN. Columns read with the raw dtypes are left as they are
+    """
+    for column in dtypes:
+        if column in df.columns and df[column].dtype != object:
+            df[column] = df[column].astype(object).where(df[column].isna(), df[column].astype(str))
+    return df
 
-def transform_data_requirements(df):
+def transform_data_requirements(df, key_map=None, cache=None):
     """
-    Transform data_requirements.csv data 
+    Transform data_requirements.csv data.
+    key_map is the persisted surrogate key map (see utils.key_map), it is updated in place
+    with new values so ids stay the same across runs.
+    cache is a CleaningCache shared between runs/chunks, cleaners only run once per distinct value
     """
+    if key_map is None:
+        key_map = {}
+    if cache is None:
+        cache = CleaningCache()
+
+    df = as_text_columns(df, REQUIREMENTS_RAW_DTYPES)
+
     # Cleaning id column
 
     df = df.rename(columns={'Unnamed: 0': 'requirement_id'})
 
     # Cleaning company column
-
-    df['company'] = df['company'].str.replace(r'\n.*', '', regex=True)
-    df['company'] = df['company'].str.strip().str.replace(r'\s+', ' ', regex=True)
-    df['company'] = df['company'].str.replace(r'[,](\s*)(?=\b(Inc|LLC|Corp|Ltd|Co)\b)', r'\1', regex=True, flags=re.IGNORECASE)
-    df['company'] = df['company'].str.replace(r'\b(Inc|LLC|Corp|Ltd|Co)\b[.,]', r'\1', regex=True, flags=re.IGNORECASE)
-    # i identify that there is a row that has empty value (NaN) in all columns except requirement_id, 
-    # so i will drop that row
-    df = df.drop(323)
-    # i also identify that there are some rows that have empty value (NaN) in company column, 
-    # after discussing with analyst team, i will fill those NaN with "Unknown"
-    df['company'] = df['company'].fillna('Unknown')
-    # apply already made function to standardize the suffix and the company name case
-    df['company'] = df['company'].apply(company_case_logic)
-    # i found that there are some rows that have '.Com' at the end of the company name 
-    # because of our function, i will replace it with '.com'
-    df['company'] = df['company'].str.replace('.Com', '.com')
+    with stage("transform.requirements.company", rows=len(df)):
+        df['company'] = df['company'].str.replace(r'\n.*', '', regex=True)
+        df['company'] = df['company'].str.strip().str.replace(r'\s+', ' ', regex=True)
+        df['company'] = df['company'].str.replace(r'[,](\s*)(?=\b(Inc|LLC|Corp|Ltd|Co)\b)', r'\1', regex=True, flags=re.IGNORECASE)
+        df['company'] = df['company'].str.replace(r'\b(Inc|LLC|Corp|Ltd|Co)\b[.,]', r'\1', regex=True, flags=re.IGNORECASE)
+        # i identify that there is a row that has empty value (NaN) in all columns except requirement_id, 
+        # so i will drop that row. errors="ignore" because in streaming mode only the chunk
+        # holding that row has it (chunks keep the row numbers of the file as index)
+        df = df.drop(323, errors="ignore")
+        # i also identify that there are some rows that have empty value (NaN) in company column, 
+        # after discussing with analyst team, i will fill those NaN with "Unknown"
+        df['company'] = df['company'].fillna('Unknown')
+        # apply already made function to standardize the suffix and the company name case
+        # (once per distinct company name through the cleaning cache)
+        df['company'] = cache.apply(df['company'], company_case_logic, "company_case_logic")
+        # i found that there are some rows that have '.Com' at the end of the company name 
+        # because of our function, i will replace it with '.com'
+        df['company'] = df['company'].str.replace('.Com', '.com')
 
     # Cleaning location column
-
-    df[["city", "state", "country", "location_type"]] = df['location'].apply(lambda x: pd.Series(normalize_location(x)))
+    with stage("transform.requirements.location", rows=len(df)):
+        # vectorized normalize_location on the distinct locations only
+        location_columns = ["city", "state", "country", "location_type"]
+        df[location_columns] = cache.apply(df['location'], normalize_location_vectorized, "normalize_location", vectorized=True, columns=location_columns)
 
     # Cleaning job_title column
-    
-    df['job_family'] = df['job_title'].apply(detect_job_family)
-    df['seniority_level'] = df['job_title'].apply(classify_seniority)
+    with stage("transform.requirements.job_title", rows=len(df)):
+        # job titles repeat a lot, so both classifiers only run on the distinct titles
+        df['job_family'] = cache.apply(df['job_title'], detect_job_family, "detect_job_family")
+        df['seniority_level'] = cache.apply(df['job_title'], classify_seniority_vectorized, "classify_seniority", vectorized=True)
 
     # Cleaning salary_estimate column
-    
-    df["salary_amount"] = (df["salary_estimate"].str.extract(r"\$([\d,\.]+)")[0].str.replace(",", "", regex=True).astype(float))
-    df["salary_period"] = df["salary_estimate"].str.extract(r"/(hr|yr)")
+    with stage("transform.requirements.salary", rows=len(df)):
+        # amount, period and currency come out of one regex pass over the distinct salary strings,
+        # annual_salary is the yearly amount in BASE_CURRENCY so queries do not convert it again
+        salary = parse_salary(df["salary_estimate"])
+        df[salary.columns] = salary
 
     # Cleaning company_size column
-    
-    # i identify that there are multiple rows that have store empty value which is NaN and 'Unknown'
-    # in company_size column, after discussing with analyst team,
-    # i will standardize those values into NaN to make it easier for further analysis
-    df['company_size'] = df['company_size'].replace('Unknown', np.nan)
-    df['company_size_min'] = df['company_size'].str.extract(r"(\d+)").astype(float)
-    df['company_size_max'] = df['company_size'].str.extract(r"to (\d+)").astype(float)
-
-    # Cleaning company_type, company_sector, and company_industry column
-    
-    # i identify that there are some rows that have store empty value which is NaN and 'Unknown'
-    # in all three columns, after discussing with analyst team,
-    # i will standardize those values into 'Unknown' to make it easier for analysis
-    # to present the data in dashboard
-    df['company_type'] = df['company_type'].fillna('Unknown')
-    df['company_sector'] = df['company_sector'].fillna('Unknown')
-    df['company_industry'] = df['company_industry'].fillna('Unknown')
-
-    # Cleaning company_founded column
-    
-    df['company_founded'] = df["company_founded"].astype("Int64")
-    # there is no invalid future year for this dataset
-    # uncheck code below to check for invalid future year
-    # invalid_future = df[df["company_founded"] > current_year]
+    with stage("transform.requirements.company_details", rows=len(df)):
+        # i identify that there are multiple rows that have store empty value which is NaN and 'Unknown'
+        # in company_size column, after discussing with analyst team,
+        # i will standardize those values into NaN to make it easier for further analysis
+        # (where instead of replace, replace turns a column that only holds 'Unknown' into float64)
+        df['company_size'] = df['company_size'].where(df['company_size'] != 'Unknown')
+        df['company_size_min'] = df['company_size'].str.extract(r"(\d+)").astype(float)
+        df['company_size_max'] = df['company_size'].str.extract(r"to (\d+)").astype(float)
+
+        # Cleaning company_type, company_sector, and company_industry column
+
+        # i identify that there are some rows that have store empty value which is NaN and 'Unknown'
+        # in all three columns, after discussing with analyst team,
+        # i will standardize those values into 'Unknown' to make it easier for analysis
+        # to present the data in dashboard
+        df['company_type'] = df['company_type'].fillna('Unknown')
+        df['company_sector'] = df['company_sector'].fillna('Unknown')
+        df['company_industry'] = df['company_industry'].fillna('Unknown')
+
+        # Cleaning company_founded column
+
+        df['company_founded'] = df["company_founded"].astype("Int64")
+        # there is no invalid future year for this dataset
+        # uncheck code below to check for invalid future year
+        # invalid_future = df[df["company_founded"] > current_year]
 
     # Cleaning company_revenue column
-
-    df["company_revenue"] = df["company_revenue"].replace("Unknown / Non-Applicable", np.nan)
-    df[["company_revenue_min", "company_revenue_max"]] = df['company_revenue'].apply(split_revenue).apply(pd.Series)
+    with stage("transform.requirements.revenue", rows=len(df)):
+        df["company_revenue"] = df["company_revenue"].where(df["company_revenue"] != "Unknown / Non-Applicable")
+        revenue_columns = ["company_revenue_min", "company_revenue_max"]
+        df[revenue_columns] = cache.apply(df['company_revenue'], split_revenue_vectorized, "split_revenue", vectorized=True, columns=revenue_columns)
 
     # Cleaning dates column
+    with stage("transform.requirements.dates", rows=len(df)):
+        # because the format is already correct, 
+        # i just need to convert it into datetime format that handles timezone (using UTC as the standard)
+        df["dates"] = pd.to_datetime(df["dates"], utc=True)
+        # date and time attributes are not derived per row anymore, dim_date and dim_time are
+        # precomputed calendars (scripts/dim_calendar.py) and the fact only keeps their keys
 
-    # because the format is already correct, 
-    # i just need to convert it into datetime format that handles timezone (using UTC as the standard)
-    df["dates"] = pd.to_datetime(df["dates"], utc=True)
-    df["date"] = df["dates"].dt.date
-    df["day"] = df["dates"].dt.day
-    df["month"] = df["dates"].dt.month
-    df["year"] = df["dates"].dt.year
-    df["time"] = df["dates"].dt.time
-    
     # Creating surrogate keys for potential dimensional tables
-
-    df["company_id"] = df["company"].astype("category").cat.codes + 1
-    df["location_id"] = df["location"].astype("category").cat.codes + 1
-    # the reason why i dont use job_title column as the base for job_id is because the cardinality
-    # of the data is too high. so i decided to left it as a descriptive column in fact table
-    # and use job_family instead
-    df["job_family_id"] = df["job_family"].astype("category").cat.codes + 1
-    df["seniority_level_id"] = df["seniority_level"].astype("category").cat.codes + 1
-    df["date_id"] = df["dates"].dt.strftime("%Y%m%d").astype(int)
-    df["time_id"] = df["dates"].dt.strftime("%H%M%S").astype(int)
+    with stage("transform.requirements.surrogate_keys", rows=len(df)):
+        # ids come from the persisted key map instead of cat.codes + 1, so a company keeps
+        # the same company_id across runs and incremental loads can upsert on it
+        df["company_id"] = assign_surrogate_keys(df["company"], key_map, "company_id")
+        df["location_id"] = assign_surrogate_keys(df["location"], key_map, "location_id")
+        # the reason why i dont use job_title column as the base for job_id is because the cardinality
+        # of the data is too high. so i decided to left it as a descriptive column in fact table
+        # and use job_family instead
+        df["job_family_id"] = assign_surrogate_keys(df["job_family"], key_map, "job_family_id")
+        df["seniority_level_id"] = assign_surrogate_keys(df["seniority_level"], key_map, "seniority_level_id")
+        # calendar keys computed arithmetically (yyyymmdd and hhmmss) instead of strftime per row
+        df["date_id"] = date_key(df["dates"])
+        df["time_id"] = time_key(df["dates"])
+
+    # Compact dtypes for the transformed frame
+    with stage("transform.requirements.dtype_plan", rows=len(df)):
+        df = apply_dtype_plan(df, REQUIREMENTS_DTYPE_PLAN, "transformed requirements" if DTYPE_MEMORY_REPORT else None)
 
     return df
 
-def transform_data_watches(df):
+def transform_data_watches(df, cache=None):
     """
-    Transform Watches.csv data 
+    Transform Watches.csv data.
+    cache is a CleaningCache shared between runs/chunks, cleaners only run once per distinct value
     """
-    # Cleaning name column
+    if cache is None:
+        cache = CleaningCache()
 
-    # the cardinality of the name column is too high, for analytics sake, i've tried to clean
-    # as much as i can to extract the brand name through many samples and pattern seaching
-    df["brand_temp"] = df["name"].str.split().str[:2].str.join(' ').str.title()
-    df["brand_cleaned"] = df["brand_temp"].apply(clean_brand)
-    df["brand_cleaned"] = df["brand_cleaned"].str.replace("Emporio_Armaniquartz", "Emperio Armani")
-    df.drop(["brand_temp"], axis=1, inplace=True)
+    df = as_text_columns(df, WATCHES_RAW_DTYPES)
 
-    # Cleaning ratings column
+    # Cleaning name column
+    with stage("transform.watches.brand", rows=len(df)):
+        # the cardinality of the name column is too high, for analytics sake, i've tried to clean
+        # as much as i can to extract the brand name through many samples and pattern seaching
+        df["brand_temp"] = df["name"].str.split().str[:2].str.join(' ').str.title()
+        # the brand matcher indexes the brand list once (configurable with WATCH_BRAND_LIST_PATH),
+        # the cache entries are tied to that brand list
+        brand_matcher = build_brand_matcher(WATCH_BRAND_LIST_PATH)
+        df["brand_cleaned"] = cache.apply(df["brand_temp"], brand_matcher.match, f"clean_brand:{brand_matcher.fingerprint}")
+        df["brand_cleaned"] = df["brand_cleaned"].str.replace("Emporio_Armaniquartz", "Emperio Armani")
+        df.drop(["brand_temp"], axis=1, inplace=True)
 
-    # i found that there are some rows that store value with text like "FREE" or "Get".
-    # probably caused by error when scraping the data. after discussing with analyst team,
-    # we agreed to standardize those values into NaN
-    df["ratings"] = df["ratings"].replace(r'[a-zA-Z]+', np.nan, regex=True).astype(float)
+    # Cleaning ratings column
+    with stage("transform.watches.ratings", rows=len(df)):
+        # i found that there are some rows that store value with text like "FREE" or "Get".
+        # probably caused by error when scraping the data. after discussing with analyst team,
+        # we agreed to standardize those values into NaN
+        df["ratings"] = df["ratings"].replace(r'[a-zA-Z]+', np.nan, regex=True).astype(float)
 
-    # Cleaning no_of_ratings column
+        # Cleaning no_of_ratings column
 
-    # i also found that there are some rows that store value with text in no_of_ratings column.
-    # after discussing with analyst team, we agreed to standardize those values into NaN
-    # and change it into Int64 because there also some NaN
-    df["no_of_ratings"] = pd.to_numeric(df["no_of_ratings"].str.replace(",", ""), errors='coerce').astype("Int64")
+        # i also found that there are some rows that store value with text in no_of_ratings column.
+        # after discussing with analyst team, we agreed to standardize those values into NaN
+        # and change it into Int64 because there also some NaN
+        df["no_of_ratings"] = pd.to_numeric(df["no_of_ratings"].str.replace(",", ""), errors='coerce').astype("Int64")
 
     # Cleaning discount_price and actual_price column
-
-    df["currency"] = df["actual_price"].str.extract(r"([^\d.,]+)")[0]
-    df["discount_price"] = df["discount_price"].str.replace(r"([^\d.,]+)", "", regex=True)
-    df["discount_price"] = pd.to_numeric(df["discount_price"], errors='coerce')
-    df["actual_price"] = df["actual_price"].str.replace(r"([^\d.,]+)", "", regex=True)
-    df["actual_price"] = pd.to_numeric(df["actual_price"], errors='coerce')
-
-    df["product_id"] = range(1, len(df) + 1)
+    with stage("transform.watches.prices", rows=len(df)):
+        # one regex pass per price column, prices are also converted to BASE_CURRENCY
+        actual_price = parse_price(df["actual_price"])
+        discount_price = parse_price(df["discount_price"])
+        df["currency"] = actual_price["currency"]
+        df["discount_price"] = discount_price["amount"]
+        df["discount_price_base"] = discount_price["base_amount"]
+        df["actual_price"] = actual_price["amount"]
+        df["actual_price_base"] = actual_price["base_amount"]
+
+    # based on the row number in the file instead of range(1, len(df) + 1),
+    # so ids keep counting across chunks in streaming mode
+    df["product_id"] = df.index + 1
+
+    # Compact dtypes for the transformed frame
+    with stage("transform.watches.dtype_plan", rows=len(df)):
+        df = apply_dtype_plan(df, WATCHES_DTYPE_PLAN, "transformed watches" if DTYPE_MEMORY_REPORT else None)
 
     return df
\ No newline at end of file
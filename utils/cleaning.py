@@ -1,19 +1,22 @@
+import hashlib
 import re
+from functools import lru_cache
 import numpy as np
 import pandas as pd
 
+suffix_mapping = {
+    'INC': 'Inc', 'inc': 'Inc', 'Inc': 'Inc',
+    'LLC': 'LLC', 'llc': 'LLC', 'Llc': 'LLC', 
+    'CORP': 'Corp', 'corp': 'Corp', 'Corp': 'Corp',
+    'LTD': 'Ltd', 'ltd': 'Ltd', 'Ltd': 'Ltd',
+    'CO': 'Co', 'co': 'Co', 'Co': 'Co'
+    }
+
 def standardize_suffix(suffix):
     """
     Standardizing the suffix commonly found in company names
     for company column cleaning
     """
-    suffix_mapping = {
-        'INC': 'Inc', 'inc': 'Inc', 'Inc': 'Inc',
-        'LLC': 'LLC', 'llc': 'LLC', 'Llc': 'LLC', 
-        'CORP': 'Corp', 'corp': 'Corp', 'Corp': 'Corp',
-        'LTD': 'Ltd', 'ltd': 'Ltd', 'Ltd': 'Ltd',
-        'CO': 'Co', 'co': 'Co', 'Co': 'Co'
-        }
     return suffix_mapping.get(suffix, suffix)
 
 def company_case_logic(name):
@@ -180,17 +183,199 @@ watch_brand_list = [
     "Lyonora", "Highend", "Hemt", "H2X"
     ]
 
+class BrandMatcher:
+    """
+    Precomputed index for brand cleaning, same first-match rules as the original nested loop:
+    an exact brand name is returned as is, otherwise the first brand (in list order)
+    that contains any word of the extracted name, otherwise "Not Listed".
+    Every substring of every brand is indexed once, so matching a name is one dict lookup
+    per word instead of a loop over the whole brand list
+    """
+    def __init__(self, brands):
+        self.brands = list(brands)
+        self.exact = set(self.brands)
+        # identifies the brand list, so cached results of another list are never reused
+        self.fingerprint = hashlib.sha256("\n".join(self.brands).encode("utf-8")).hexdigest()[:16]
+
+        # substring -> position of the first brand containing it
+        self.substring_index = {}
+        for position, brand in enumerate(self.brands):
+            for start in range(len(brand)):
+                for end in range(start + 1, len(brand) + 1):
+                    self.substring_index.setdefault(brand[start:end], position)
+
+    def match(self, extracted_brands):
+        """
+        Cleaned brand for one extracted name
+        """
+        if extracted_brands in self.exact:
+            return extracted_brands
+
+        positions = [self.substring_index[word] for word in extracted_brands.split() if word in self.substring_index]
+        if positions:
+            return self.brands[min(positions)]
+        return "Not Listed"
+
+def load_brand_list(path):
+    """
+    Read a brand list file, one brand per line (blank lines and # comments are skipped)
+    """
+    with open(path, encoding="utf-8") as f:
+        lines = (line.strip() for line in f)
+        return [line for line in lines if line and not line.startswith("#")]
+
+@lru_cache(maxsize=None)
+def build_brand_matcher(path=None):
+    """
+    Brand matcher for the given brand list file, or for the built-in watch_brand_list.
+    Built once per path
+    """
+    brands = load_brand_list(path) if path else watch_brand_list
+    return BrandMatcher(brands)
+
 def clean_brand(extracted_brands):
     """
     Cleaning brand names with manually listed brand names
     """
+    return build_brand_matcher().match(extracted_brands)
 
-    if extracted_brands in watch_brand_list:
-        return extracted_brands
-    
-    for brand in watch_brand_list:
-        for word in extracted_brands.split():
-            if word in brand:
-                return brand
-            
-    return "Not Listed"
\ No newline at end of file
+# Vectorized versions of the cleaners above.
+# They take a whole column (Series) and give exactly the same output as calling
+# the row-wise function with .apply, but run on pandas string ops, combined regexes
+# and np.select instead of a python function call per row
+
+company_suffix_pattern = re.compile(r'^(.*?)\b(Inc|LLC|Corp|Ltd|Co)\b(.*)$', flags=re.IGNORECASE)
+
+def _title_if_single_case(names):
+    """
+    Title case the names that are fully upper or fully lower case, leave mixed case as is
+    """
+    single_case = names.str.isupper().eq(True) | names.str.islower().eq(True)
+    return names.where(~single_case, names.str.title())
+
+def company_case_logic_vectorized(names):
+    """
+    Vectorized company_case_logic for a Series of company names
+    """
+    parts = names.str.extract(company_suffix_pattern)
+    has_suffix = parts[1].notna()
+
+    base_name = _title_if_single_case(parts[0].str.strip())
+    # where instead of fillna, fillna on object columns downcasts (deprecated in pandas 2.x)
+    mapped_suffix = parts[1].map(suffix_mapping)
+    standardized_suffix = mapped_suffix.where(mapped_suffix.notna(), parts[1])
+    content_after = parts[2].str.strip()
+
+    with_suffix = base_name + " " + standardized_suffix
+    with_suffix = with_suffix.where(content_after.fillna("") == "", with_suffix + " " + content_after)
+
+    return with_suffix.where(has_suffix, _title_if_single_case(names))
+
+def normalize_location_vectorized(locations):
+    """
+    Vectorized normalize_location, returns a dataframe with city, state, country and location_type columns
+    """
+    is_city = locations.str.contains(",", regex=False, na=False)
+    is_remote = locations == "Remote"
+    is_country = locations == "United States"
+    is_state = locations.isin(state_abbrev.keys())
+
+    # partition always gives 3 columns (before, separator, after), even when no row has a comma
+    parts = locations.str.partition(",")
+
+    result = pd.DataFrame(index=locations.index)
+    result["city"] = parts[0].str.strip().where(is_city, None)
+    result["state"] = parts[2].str.strip().where(is_city, locations.map(state_abbrev).where(is_state, None))
+    result["country"] = pd.Series(np.where(is_city | is_country | is_state, "United States", None), index=locations.index)
+    result["location_type"] = np.select(
+        [is_city, is_remote, is_country, is_state],
+        ["City", "Remote", "Country", "State"],
+        default="Unknown"
+        )
+    return result
+
+# keyword groups of detect_job_family, in the same priority order
+job_family_rules = [
+    ("Data Analyst", [r"analyst|analytics|visualization"]),
+    ("Data Scientist", [r"science|scientist"]),
+    ("Software Engineer", [r"software", r"engineer"]),
+    ("Infrastructure Engineer", [r"data center|infrastructure|network|systems|system|configuration"]),
+    ("Data Engineer", [r"data", r"engineer"])
+    ]
+
+def _first_matching_label(lowered, rules, default):
+    """
+    Label every row with the first rule whose patterns all match (np.select semantics).
+    Each rule only scans the rows that no earlier rule has labelled yet
+    """
+    labels = np.full(len(lowered), default, dtype=object)
+    remaining = np.ones(len(lowered), dtype=bool)
+
+    for label, patterns in rules:
+        candidates = lowered[remaining]
+        matched = np.ones(len(candidates), dtype=bool)
+        for pattern in patterns:
+            matched &= candidates.str.contains(pattern, regex=True, na=False).to_numpy(dtype=bool)
+
+        positions = np.flatnonzero(remaining)[matched]
+        labels[positions] = label
+        remaining[positions] = False
+        if not remaining.any():
+            break
+
+    return pd.Series(labels, index=lowered.index)
+
+def detect_job_family_vectorized(titles):
+    """
+    Vectorized detect_job_family, every keyword group is one combined regex
+    and the first matching family wins
+    """
+    return _first_matching_label(titles.str.lower(), job_family_rules, "Other")
+
+# one combined regex per seniority level, in the same priority order as classify_seniority.
+# the roman numerals were matched with re.IGNORECASE there, so they keep the scoped (?i:) flag
+seniority_rules = [
+    ("Manager", re.compile(r"\bmanager\b|\bmgr\b")),
+    ("Principal", re.compile(r"\bprincipal\b|(?i:\biv\b)|level\s*4")),
+    ("Staff", re.compile(r"\bstaff\b")),
+    ("Senior", re.compile(r"\bsr\b|\bsenior\b|(?i:\biii\b)|level\s*3")),
+    ("Lead", re.compile(r"\blead\b")),
+    ("Associate", re.compile(r"\bassociate\b|\bassoc\b")),
+    ("Junior", re.compile(r"\bjunior\b|\bintern\b|(?i:\bi\b)|level\s*1")),
+    ("Mid", re.compile(r"\bmid\b|(?i:\bii\b)|level\s*2"))
+    ]
+
+def classify_seniority_vectorized(titles):
+    """
+    Vectorized classify_seniority, one combined regex per level instead of up to ~25 re.search calls per title
+    """
+    return _first_matching_label(titles.str.lower(), [(level, [pattern]) for level, pattern in seniority_rules], "Mid")
+
+revenue_number = r"\d+\.?\d*"
+
+def split_revenue_vectorized(revenue):
+    """
+    Vectorized split_revenue, returns a dataframe with min and max revenue columns
+    """
+    # the str accessor gives NaN for non string values, same as the isinstance check of split_revenue
+    number_count = revenue.str.count(revenue_number)
+    first = revenue.str.extract(f"({revenue_number})", expand=False).astype(float)
+    # \D+ between the numbers works because a number always ends right before a non digit
+    second = revenue.str.extract(rf"^\D*{revenue_number}\D+({revenue_number})", expand=False).astype(float)
+
+    less_than = revenue.str.contains("Less than", regex=False, na=False)
+    scale = np.select(
+        [revenue.str.contains("billion", regex=False, na=False),
+         revenue.str.contains("million", regex=False, na=False)],
+        [1_000_000_000, 1_000_000],
+        default=1
+        )
+
+    revenue_min = np.where(number_count.isin([1, 2]), first * scale, np.nan)
+    revenue_max = np.where(number_count == 2, second * scale, np.nan)
+
+    # "Less than $1 million" means anything from 0 up to that number (always in million)
+    revenue_min = np.where(less_than, 0, revenue_min)
+    revenue_max = np.where(less_than, first * 1_000_000, revenue_max)
+
+    return pd.DataFrame({"revenue_min": revenue_min, "revenue_max": revenue_max}, index=revenue.index)
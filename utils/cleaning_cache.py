@@ -0,0 +1,157 @@
+import hashlib
+import os
+import pickle
+from collections import OrderedDict
+import pandas as pd
+from config.setting import CLEANING_CACHE_SIZE
+
+# cleaned values depend on the cleaning code, a persisted cache built by another
+# version of utils/cleaning.py is thrown away instead of reused
+CLEANING_CODE_PATH = os.path.join(os.path.dirname(__file__), "cleaning.py")
+
+def cleaning_code_version():
+    """
+    Hash of utils/cleaning.py, stored with the persisted cache
+    """
+    with open(CLEANING_CODE_PATH, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def _value_key(value):
+    # NaN != NaN, so every kind of missing value shares one key
+    return None if pd.isna(value) else value
+
+class CleaningCache:
+    """
+    Bounded LRU cache of cleaner results, keyed on (cleaner name, input value).
+    Columns like location, company or job_title have far fewer distinct values than rows,
+    so every cleaner runs once per distinct value and the results are mapped back to the rows.
+    With a path the cache is loaded from and saved to disk, so daily loads reuse it
+    """
+    def __init__(self, maxsize=CLEANING_CACHE_SIZE, path=None):
+        self.maxsize = maxsize
+        self.path = path
+        self.entries = OrderedDict()
+        self.hits = {}
+        self.misses = {}
+        self.rows = {}
+
+        if path is not None:
+            self.load()
+
+    def load(self):
+        """
+        Load the persisted cache, ignored when missing or built by other cleaning code
+        """
+        if not os.path.exists(self.path):
+            return
+
+        with open(self.path, "rb") as f:
+            state = pickle.load(f)
+        if state.get("version") != cleaning_code_version():
+            print(f"Cleaning cache {self.path} was built by other cleaning code, starting empty.")
+            return
+
+        self.entries = state["entries"]
+        self._evict()
+
+    def save(self):
+        """
+        Persist the cache (only when it was created with a path)
+        """
+        if self.path is None:
+            return
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump({"version": cleaning_code_version(), "entries": self.entries}, f)
+        os.replace(tmp_path, self.path)
+
+    def merge(self, other):
+        """
+        Add the entries and statistics of another cache (e.g. one filled in a worker process)
+        """
+        for key, result in other.entries.items():
+            self.entries[key] = result
+            self.entries.move_to_end(key)
+        self._evict()
+
+        for counter, other_counter in ((self.hits, other.hits), (self.misses, other.misses), (self.rows, other.rows)):
+            for name, count in other_counter.items():
+                counter[name] = counter.get(name, 0) + count
+
+    def _evict(self):
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def apply(self, series, func, name, vectorized=False, columns=None):
+        """
+        Apply a cleaner to a Series once per distinct value.
+        func is a row-wise cleaner, or a vectorized one (Series in, Series/DataFrame out) with vectorized=True.
+        Cleaners returning tuples (or DataFrames) need columns, the result is then a DataFrame
+        """
+        codes, uniques = pd.factorize(series, use_na_sentinel=False)
+
+        results = [None] * len(uniques)
+        missing = []
+        for position, value in enumerate(uniques):
+            key = (name, _value_key(value))
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                results[position] = self.entries[key]
+            else:
+                missing.append(position)
+
+        if missing:
+            missing_values = uniques[missing]
+            if vectorized:
+                # object dtype, values that are all missing would be inferred as float64 (no str accessor)
+                computed = func(pd.Series(missing_values, dtype=object))
+                if isinstance(computed, pd.DataFrame):
+                    computed = list(computed.itertuples(index=False, name=None))
+                else:
+                    computed = computed.tolist()
+            else:
+                computed = [func(value) for value in missing_values]
+
+            for position, value, result in zip(missing, missing_values, computed):
+                results[position] = result
+                self.entries[(name, _value_key(value))] = result
+            self._evict()
+
+        self.hits[name] = self.hits.get(name, 0) + len(uniques) - len(missing)
+        self.misses[name] = self.misses.get(name, 0) + len(missing)
+        self.rows[name] = self.rows.get(name, 0) + len(series)
+
+        if columns is None:
+            return pd.Series(results, dtype=object).take(codes).set_axis(series.index)
+        return pd.DataFrame(results, columns=columns).take(codes).set_axis(series.index)
+
+    def stats(self):
+        """
+        Hit/miss statistics per cleaner. hits and misses count distinct values,
+        rows is how many rows were cleaned with them
+        """
+        stats = {}
+        for name in self.rows:
+            lookups = self.hits[name] + self.misses[name]
+            stats[name] = {
+                "rows": self.rows[name],
+                "distinct_values": lookups,
+                "hits": self.hits[name],
+                "misses": self.misses[name],
+                "hit_rate": round(self.hits[name] / lookups, 4) if lookups else 0.0
+                }
+        return stats
+
+    def report(self):
+        """
+        Print the hit/miss statistics
+        """
+        print(f"\nCleaning cache ({len(self.entries)}/{self.maxsize} entries):")
+        for name, stat in self.stats().items():
+            print(f"  {name}: {stat['rows']} rows, {stat['distinct_values']} distinct values, "
+                  f"{stat['hits']} hits / {stat['misses']} misses (hit rate {stat['hit_rate']:.1%})")
\ No newline at end of file
@@ -1,23 +1,219 @@
-def data_demographi(df, exclude_columns=None):
-    """
-    Generate data demographi/profiling for the given tables
-    """
-    # adding exclude columns parameter because some categorical columns are too long
-    # for example: job_description column from data_requirements table
-    if exclude_columns is None:
-        exclude_columns = []
-
-    print("Row count:", len(df))
-    print("Column count:", len(df.columns))
-    
-    print("\nMissing values per column:")
-    print(df.isna().sum())
-    
-    print("\nUnique values per column:")
-    print(df.nunique())
-    
-    print("\nTop 5 most frequent values per categorical column:")
-    for col in df.select_dtypes(include="object").columns:
-        if col not in exclude_columns:
-            print(f"\nColumn: {col}")
-            print(df[col].value_counts().head(5))
+import json
+import os
+import numpy as np
+import pandas as pd
+from config.setting import PROFILE_TOP_K, PROFILE_EXACT_LIMIT, PROFILE_UNIQUE_RATIO, PROFILE_OUTPUT_DIR
+from utils.sketches import HeavyHitters, HyperLogLog, hash_values
+
+def _json_value(value):
+    """
+    Plain python (JSON serializable) version of a profiled value
+    """
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    return str(value)
+
+class ColumnProfile:
+    """
+    Null count, distinct count and top-k values of one column, updated chunk by chunk.
+    Exact (one factorize per chunk) until the column has more than exact_limit distinct values,
+    then HyperLogLog for the distinct count and count-min heavy hitters for the top-k.
+    top_k=0 skips the top values (numeric and date columns), they are also left out when the column
+    is near unique (distinct count >= unique_ratio x non null count)
+    """
+    def __init__(self, dtype, top_k=PROFILE_TOP_K, exact_limit=PROFILE_EXACT_LIMIT, approximate=False, unique_ratio=PROFILE_UNIQUE_RATIO):
+        self.dtype = str(dtype)
+        self.top_k = top_k
+        self.exact_limit = exact_limit
+        self.unique_ratio = unique_ratio
+        self.null_count = 0
+        self.value_count = 0
+        self.counts = None
+        self.distinct = None
+        self.heavy_hitters = None
+        if approximate:
+            self._start_approximate()
+
+    @property
+    def approximate(self):
+        return self.distinct is not None
+
+    def _start_approximate(self):
+        self.distinct = HyperLogLog()
+        if self.top_k:
+            self.heavy_hitters = HeavyHitters(capacity=max(100, 20 * self.top_k))
+
+    def update(self, series):
+        if self.approximate:
+            values = series.dropna().array
+            self.null_count += len(series) - len(values)
+            self.value_count += len(values)
+            hashes = hash_values(values)
+            self.distinct.update(hashes)
+            if self.heavy_hitters is not None:
+                self.heavy_hitters.update(hashes, values)
+            return
+
+        # one pass: factorize gives the nulls (code -1), the distinct values and, with bincount, their counts
+        codes, uniques = pd.factorize(series)
+        nulls = int(np.count_nonzero(codes == -1))
+        self.null_count += nulls
+        self.value_count += len(codes) - nulls
+        if isinstance(uniques, pd.Categorical):
+            # plain values, the categories of two chunks can differ
+            uniques = np.asarray(uniques)
+        chunk_counts = pd.Series(np.bincount(codes[codes >= 0], minlength=len(uniques)), index=pd.Index(uniques))
+        self.counts = chunk_counts if self.counts is None else self.counts.add(chunk_counts, fill_value=0)
+
+        if len(self.counts) > self.exact_limit:
+            self._switch_to_approximate()
+
+    def _switch_to_approximate(self):
+        # the exact counts so far become the first input of the sketches
+        values = self.counts.index
+        hashes = hash_values(values)
+        self._start_approximate()
+        self.distinct.update(hashes)
+        if self.heavy_hitters is not None:
+            self.heavy_hitters.update(hashes, values, counts=self.counts.to_numpy(dtype=np.float64))
+        self.counts = None
+
+    def result(self):
+        if self.approximate:
+            distinct_count = self.distinct.count()
+            top_values = self.heavy_hitters.top(self.top_k) if self.top_k else []
+        elif self.counts is None:
+            distinct_count = 0
+            top_values = []
+        else:
+            distinct_count = len(self.counts)
+            top = self.counts.sort_values(ascending=False, kind="stable").head(self.top_k)
+            top_values = list(zip(top.index, top.to_numpy()))
+
+        result = {
+            "dtype": self.dtype,
+            "null_count": self.null_count,
+            "distinct_count": distinct_count,
+            "approximate": self.approximate
+            }
+        near_unique = self.value_count > 0 and distinct_count >= self.unique_ratio * self.value_count
+        if self.top_k and not near_unique:
+            result["top_values"] = {str(_json_value(value)): int(count) for value, count in top_values}
+        return result
+
+class DataProfiler:
+    """
+    Profile (data demographi) of a table, fed with the whole dataframe or chunk by chunk.
+    exclude_columns are profiled without top values (long free text like job_description),
+    sample is an optional fraction (0-1) or number of rows profiled per update
+    """
+    def __init__(self, exclude_columns=None, top_k=PROFILE_TOP_K, exact_limit=PROFILE_EXACT_LIMIT, sample=None, seed=42):
+        if isinstance(exclude_columns, str):
+            exclude_columns = [exclude_columns]
+        self.exclude_columns = set(exclude_columns or [])
+        self.top_k = top_k
+        self.exact_limit = exact_limit
+        self.sample = sample
+        self.seed = seed
+        self.row_count = 0
+        self.profiled_rows = 0
+        self.columns = {}
+
+    def _sample(self, df):
+        if self.sample is None:
+            return df
+        if isinstance(self.sample, float):
+            return df.sample(frac=self.sample, random_state=self.seed)
+        return df.sample(n=min(self.sample, len(df)), random_state=self.seed)
+
+    def _looks_high_cardinality(self, series):
+        # free text (job_description, image, link ...), ids and timestamps are detected from a small
+        # head sample, so they go straight to the sketches instead of being counted exactly first
+        if len(series) <= self.exact_limit or isinstance(series.dtype, pd.CategoricalDtype):
+            return False
+        head = series.dropna().head(1000)
+        return len(head) > 0 and head.nunique() > 0.5 * len(head)
+
+    def update(self, df):
+        self.row_count += len(df)
+        df = self._sample(df)
+        self.profiled_rows += len(df)
+
+        for column in df.columns:
+            series = df[column]
+            if column not in self.columns:
+                # top values only for the categorical (text) columns that are not excluded, like the old printed profile
+                text = series.dtype == object or isinstance(series.dtype, pd.CategoricalDtype)
+                top_k = self.top_k if text and column not in self.exclude_columns else 0
+                self.columns[column] = ColumnProfile(series.dtype, top_k, self.exact_limit, self._looks_high_cardinality(series))
+            self.columns[column].update(series)
+
+    def result(self):
+        return {
+            "row_count": self.row_count,
+            "profiled_rows": self.profiled_rows,
+            "sampled": self.sample is not None,
+            "column_count": len(self.columns),
+            "columns": {name: column.result() for name, column in self.columns.items()}
+            }
+
+def data_demographi(df, exclude_columns=None, sample=None, top_k=PROFILE_TOP_K):
+    """
+    Generate data demographi/profiling for the given tables.
+    Returns a dict (null count, distinct count and top-k values per column) instead of printing,
+    exclude_columns get no top values
+    """
+    profiler = DataProfiler(exclude_columns, top_k=top_k, sample=sample)
+    profiler.update(df)
+    return profiler.result()
+
+def compare_profiles(previous, current):
+    """
+    Differences between two profiles of the same table: row count and per column
+    null/distinct counts, plus added and removed columns
+    """
+    changes = {}
+    if previous["row_count"] != current["row_count"]:
+        changes["row_count"] = [previous["row_count"], current["row_count"]]
+
+    previous_columns = previous["columns"]
+    current_columns = current["columns"]
+    added = sorted(set(current_columns) - set(previous_columns))
+    removed = sorted(set(previous_columns) - set(current_columns))
+    if added:
+        changes["added_columns"] = added
+    if removed:
+        changes["removed_columns"] = removed
+
+    column_changes = {}
+    for name in set(previous_columns) & set(current_columns):
+        diff = {
+            metric: [previous_columns[name][metric], current_columns[name][metric]]
+            for metric in ("dtype", "null_count", "distinct_count")
+            if previous_columns[name][metric] != current_columns[name][metric]
+            }
+        if diff:
+            column_changes[name] = diff
+    if column_changes:
+        changes["columns"] = dict(sorted(column_changes.items()))
+    return changes
+
+def store_profile(profile, name, output_dir=PROFILE_OUTPUT_DIR):
+    """
+    Save the profile as output_dir/name.json and return its changes against the previous run's profile
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, f"{name}.json")
+
+    changes = None
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            changes = compare_profiles(json.load(f), profile)
+
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(profile, f, ensure_ascii=False, indent=2)
+    return changes
\ No newline at end of file
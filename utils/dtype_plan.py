@@ -0,0 +1,21 @@
+def memory_usage_mb(df):
+    """
+    Deep memory usage of a dataframe in MB (object columns are measured string by string)
+    """
+    return df.memory_usage(deep=True).sum() / 1_000_000
+
+def apply_dtype_plan(df, plan, label=None):
+    """
+    Cast the columns of a transformed dataframe to the compact dtypes of the plan
+    ({column: dtype}, columns missing from the dataframe are skipped).
+    With a label, memory usage before and after is printed
+    """
+    if label is not None:
+        memory_before = memory_usage_mb(df)
+
+    df = df.astype({column: dtype for column, dtype in plan.items() if column in df.columns})
+
+    if label is not None:
+        memory_after = memory_usage_mb(df)
+        print(f"Memory usage of {label}: {memory_before:.2f} MB -> {memory_after:.2f} MB after dtype plan.")
+    return df
\ No newline at end of file
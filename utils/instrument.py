@@ -0,0 +1,165 @@
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+from config.setting import RUN_REPORT_PATH, RUN_REPORT_MAX_BYTES, RUN_REPORT_BACKUPS, TRACE_MEMORY
+
+# resource is unix only, without it (Windows) stages are recorded without peak RSS
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Stage instrumentation: every stage (extract, transform step, load, file write ...) records its wall time,
+# rows, rows/sec and memory, and is appended as one JSON line to the run report.
+# Worker processes inherit the run id and report path through the environment, so their stages land in the same run
+
+RUN_ID_ENV = "PIPELINE_RUN_ID"
+RUN_REPORT_ENV = "PIPELINE_RUN_REPORT"
+
+_report_lock = threading.Lock()
+_local = threading.local()
+
+def rotate_report(report_path=RUN_REPORT_PATH, max_bytes=RUN_REPORT_MAX_BYTES, backups=RUN_REPORT_BACKUPS):
+    """
+    Rotate the run report once it is larger than max_bytes: report.jsonl -> report.jsonl.1 -> ... -> report.jsonl.<backups>,
+    the oldest one is dropped. Only done between runs, so the stages of a run always are in one file
+    """
+    if report_path is None or not max_bytes or not os.path.exists(report_path) or os.path.getsize(report_path) <= max_bytes:
+        return
+    for number in range(backups, 0, -1):
+        source = report_path if number == 1 else f"{report_path}.{number - 1}"
+        if os.path.exists(source):
+            os.replace(source, f"{report_path}.{number}")
+    if os.path.exists(report_path):
+        os.remove(report_path)
+
+def start_run(report_path=RUN_REPORT_PATH, trace_memory=TRACE_MEMORY):
+    """
+    Start a new run: new run id, the report its stages are appended to (None records nothing, e.g. benchmarks),
+    the run report rotated if it grew too large, and tracemalloc started if trace_memory
+    """
+    rotate_report(report_path)
+    run_id = uuid.uuid4().hex[:12]
+    os.environ[RUN_ID_ENV] = run_id
+    # empty when the run has no report
+    os.environ[RUN_REPORT_ENV] = report_path or ""
+    if trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    return run_id
+
+def current_run_id():
+    return os.environ.get(RUN_ID_ENV)
+
+def current_report_path():
+    """
+    Report of the current run (None when it has no report), RUN_REPORT_PATH outside of a run
+    """
+    report_path = os.environ.get(RUN_REPORT_ENV)
+    if report_path is None:
+        return RUN_REPORT_PATH
+    return report_path or None
+
+def peak_rss_mb():
+    """
+    Peak resident set size of the process so far in MB (ru_maxrss is in KB on Linux, bytes on macOS),
+    None where the resource module is not available
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1_000_000 if sys.platform == "darwin" else peak / 1_000
+
+def _emit(record, report_path):
+    if report_path is None:
+        return
+    directory = os.path.dirname(report_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with _report_lock, open(report_path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, default=str) + "\n")
+
+@contextmanager
+def stage(name, rows=None, report_path=None, **fields):
+    """
+    Instrument the block as one stage of the run, appended to report_path (default: the report of the current run).
+    Yields the stage record, so rows (or any other field) can be set inside the block when they are only known
+    at the end, e.g. record["rows"] = len(df).
+    Nested stages are recorded separately, the outer stage includes the time of the inner ones
+    """
+    report_path = report_path or current_report_path()
+    record = {"run_id": current_run_id(), "pid": os.getpid(), "stage": name, "rows": rows, **fields}
+
+    # tracemalloc has a single process wide peak, nested stages push the peak they saw
+    # to their parent before resetting it
+    peaks = getattr(_local, "peaks", None)
+    if peaks is None:
+        peaks = _local.peaks = []
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        if peaks:
+            peaks[-1] = max(peaks[-1], tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+        peaks.append(0)
+
+    rss_before = peak_rss_mb()
+    start = time.perf_counter()
+    record["started_at"] = time.time()
+    try:
+        yield record
+        record["status"] = "ok"
+    except BaseException as e:
+        record["status"] = "error"
+        record["error"] = repr(e)
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        record["seconds"] = round(elapsed, 6)
+        if record["rows"] is not None:
+            record["rows"] = int(record["rows"])
+            record["rows_per_sec"] = round(record["rows"] / elapsed, 1) if elapsed > 0 else None
+        rss_after = peak_rss_mb()
+        record["peak_rss_mb"] = None if rss_after is None else round(rss_after, 1)
+        record["peak_rss_growth_mb"] = None if rss_after is None else round(rss_after - rss_before, 1)
+        if tracing:
+            stage_peak = max(peaks.pop(), tracemalloc.get_traced_memory()[1])
+            record["tracemalloc_peak_mb"] = round(stage_peak / 1_000_000, 1)
+            if peaks:
+                peaks[-1] = max(peaks[-1], stage_peak)
+        _emit(record, report_path)
+
+def read_run_report(run_id=None, report_path=None):
+    """
+    Stage records of one run (the last run by default) from the JSON lines report (default: the report of the current run)
+    """
+    report_path = report_path or current_report_path()
+    if report_path is None or not os.path.exists(report_path):
+        return []
+    with open(report_path, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    if run_id is None and records:
+        run_id = records[-1]["run_id"]
+    return [record for record in records if record["run_id"] == run_id]
+
+def summarize_run(run_id=None, report_path=None, top=15):
+    """
+    Print the slowest stages of a run: calls, total seconds, rows and rows/sec per stage name
+    """
+    totals = {}
+    for record in read_run_report(run_id, report_path):
+        total = totals.setdefault(record["stage"], {"calls": 0, "seconds": 0.0, "rows": 0, "peak_rss_mb": 0.0})
+        total["calls"] += 1
+        total["seconds"] += record["seconds"]
+        total["rows"] += record["rows"] or 0
+        total["peak_rss_mb"] = max(total["peak_rss_mb"], record["peak_rss_mb"] or 0.0)
+    if not totals:
+        return
+
+    print(f"\n{'stage':<45} {'calls':>6} {'seconds':>9} {'rows':>10} {'rows/sec':>12} {'peak rss MB':>12}")
+    for name, total in sorted(totals.items(), key=lambda item: item[1]["seconds"], reverse=True)[:top]:
+        rows_per_sec = f"{total['rows'] / total['seconds']:,.0f}" if total["rows"] and total["seconds"] > 0 else "-"
+        print(f"{name:<45} {total['calls']:>6} {total['seconds']:>9.3f} {total['rows']:>10} {rows_per_sec:>12} {total['peak_rss_mb']:>12.1f}")
\ No newline at end of file
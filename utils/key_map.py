@@ -0,0 +1,43 @@
+import json
+import os
+
+def load_key_map(path):
+    """
+    Load the persisted surrogate key map, returns an empty map when there is no file yet (first run)
+    """
+    if not os.path.exists(path):
+        return {}
+
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def save_key_map(key_map, path):
+    """
+    Persist the surrogate key map so the next run hands out the same ids
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    # write to a temporary file first, a crash halfway must not corrupt the ids of previous runs
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(key_map, f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+def assign_surrogate_keys(series, key_map, key_name):
+    """
+    Map natural key values to stable surrogate ids using the key map.
+    Values already in the map keep their id, new values get the next free ids
+    """
+    mapping = key_map.setdefault(key_name, {})
+
+    # new values are numbered in sorted order, so on the first run (empty map) the ids are
+    # exactly the same as the old cat.codes + 1 logic
+    new_values = sorted(value for value in series.dropna().unique() if value not in mapping)
+    next_id = max(mapping.values(), default=0) + 1
+    for offset, value in enumerate(new_values):
+        mapping[value] = next_id + offset
+
+    # missing values keep id 0 like cat.codes (-1) + 1 did
+    return series.map(mapping).fillna(0).astype(int)
\ No newline at end of file
@@ -0,0 +1,63 @@
+import re
+import pandas as pd
+from config.setting import CURRENCY_SYMBOLS, CURRENCY_RATES, ANNUAL_WORK_HOURS
+
+# Single pass parsing of the money strings: one compiled pattern per column gives the currency symbol,
+# the amount and (for salaries) the pay period of every value, and it only runs on the distinct values
+
+_symbols = "|".join(re.escape(symbol) for symbol in sorted(CURRENCY_SYMBOLS, key=len, reverse=True))
+
+# salary_estimate: "$120,000 /yr", "$44.23 /hr". The first currency symbol followed by a number,
+# then the first "/hr" or "/yr" (also found when there is no amount)
+SALARY_PATTERN = re.compile(rf"^(?:.*?(?P<currency>{_symbols})(?P<amount>[\d,.]+))?(?:.*?/(?P<period>hr|yr))?")
+
+# actual_price / discount_price: "₹1,299", "₹99.5". Whatever comes before the number is the currency
+PRICE_PATTERN = re.compile(r"^(?P<currency>[^\d.,]+)?(?P<amount>[\d.,]+)?")
+
+# pay periods per year
+PERIODS_PER_YEAR = {"hr": ANNUAL_WORK_HOURS, "yr": 1}
+
+def extract_distinct(values, pattern):
+    """
+    str.extract of pattern on the distinct values of a Series.
+    Returns (groups of every distinct value, codes mapping the rows to them)
+    """
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    return pd.Series(uniques, dtype=object).str.extract(pattern), codes
+
+def base_currency_rate(currencies):
+    """
+    Value of one unit of each currency symbol in BASE_CURRENCY, NaN for unknown symbols
+    """
+    return currencies.map(CURRENCY_SYMBOLS).map(CURRENCY_RATES).astype(float)
+
+def parse_salary(values):
+    """
+    Parse salary_estimate values into salary_amount, salary_period (hr/yr), salary_currency (symbol)
+    and annual_salary (hourly amounts x ANNUAL_WORK_HOURS, in BASE_CURRENCY)
+    """
+    parts, codes = extract_distinct(values, SALARY_PATTERN)
+    amount = parts["amount"].str.replace(",", "", regex=False).astype(float)
+    parsed = pd.DataFrame({
+        "salary_amount": amount,
+        "salary_period": parts["period"],
+        "salary_currency": parts["currency"],
+        "annual_salary": amount * parts["period"].map(PERIODS_PER_YEAR).astype(float) * base_currency_rate(parts["currency"])
+        })
+    return parsed.take(codes).set_axis(values.index)
+
+def parse_price(values):
+    """
+    Parse price values into amount, currency (symbol) and base_amount (amount in BASE_CURRENCY).
+    The thousands separators are removed like for salaries ("₹2,499" is 2499), amounts that are
+    still not numbers are NaN
+    """
+    parts, codes = extract_distinct(values, PRICE_PATTERN)
+    # always float, to_numeric gives int64 when none of the amounts is missing or decimal (e.g. a small chunk)
+    amount = pd.to_numeric(parts["amount"].str.replace(",", "", regex=False), errors="coerce").astype(float)
+    parsed = pd.DataFrame({
+        "amount": amount,
+        "currency": parts["currency"],
+        "base_amount": amount * base_currency_rate(parts["currency"])
+        })
+    return parsed.take(codes).set_axis(values.index)
\ No newline at end of file
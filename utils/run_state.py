@@ -0,0 +1,133 @@
+import hashlib
+import json
+import os
+import pandas as pd
+
+# Code that decides what the output tables look like (reading, cleaning, surrogate keys, dtypes,
+# table slicing and how they are written), a change in any of these files invalidates the recorded
+# fingerprints of both datasets. Settings that change the outputs are part of the fingerprints
+# as extra values (see dataset_fingerprints in scripts/pipeline.py)
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TRANSFORM_CODE_PATHS = [
+    "utils/cleaning.py", "utils/cleaning_cache.py", "utils/numeric_parsing.py", "utils/dtype_plan.py", "utils/key_map.py",
+    "scripts/extract.py", "scripts/transform.py", "scripts/dim_calendar.py", "scripts/star_schema.py", "scripts/load.py",
+    "scripts/pipeline.py"
+    ]
+
+def file_hash(path, block_size=1 << 20):
+    """
+    sha256 of a file, read in blocks so large input files are never loaded at once
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def transform_code_hash(paths=TRANSFORM_CODE_PATHS):
+    """
+    One hash of the cleaning/transform code files
+    """
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(path.encode("utf-8"))
+        digest.update(file_hash(os.path.join(PROJECT_DIR, path)).encode("utf-8"))
+    return digest.hexdigest()
+
+def settings_hash(values):
+    """
+    Short hash of configuration values (anything JSON serializable)
+    """
+    return hashlib.sha256(json.dumps(values, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+
+def dataset_fingerprint(input_path, **extra):
+    """
+    Everything a dataset's output depends on: the input file content, the transform code and
+    extra inputs (e.g. the brand list fingerprint of the watches dataset, settings the output depends on)
+    """
+    return {"input": file_hash(input_path), "code": transform_code_hash(), **extra}
+
+class TableHash:
+    """
+    Content hash and row count of a table, updated chunk by chunk.
+    Row hashes are summed (modulo 2^64), so the batch table and the same rows loaded
+    in streaming chunks give the same hash
+    """
+    def __init__(self):
+        self.rows = 0
+        self.total = 0
+        self.columns = None
+
+    def update(self, df):
+        self.rows += len(df)
+        self.columns = list(df.columns)
+        if len(df):
+            row_hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+            self.total = (self.total + int(row_hashes.sum(dtype="uint64"))) % (1 << 64)
+        return self
+
+    def hexdigest(self):
+        columns = hashlib.sha256("\n".join(self.columns or []).encode("utf-8")).hexdigest()[:16]
+        return f"{columns}-{self.rows}-{self.total:016x}"
+
+def table_hash(df):
+    return TableHash().update(df).hexdigest()
+
+class RunState:
+    """
+    Run-state manifest: fingerprint of every processed dataset and row count and content hash
+    of every output table, per output (postgres, csv, parquet ...) they were last loaded/written to.
+    A dataset with the same fingerprint as the last run, or a table with the same hash as the one
+    already in an output, does not have to be processed again
+    """
+    def __init__(self, path):
+        self.path = path
+        self.datasets = {}
+        self.tables = {}
+        if path is not None and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                state = json.load(f)
+            self.datasets = state.get("datasets", {})
+            self.tables = state.get("tables", {})
+
+    def dataset_unchanged(self, name, fingerprint, outputs):
+        """
+        True when every one of outputs was last loaded/written from the same dataset fingerprint
+        """
+        recorded = self.datasets.get(name, {}).get("outputs", {})
+        return bool(outputs) and all(recorded.get(output) == fingerprint for output in outputs)
+
+    def table_unchanged(self, name, content_hash, output):
+        return self.tables.get(name, {}).get("outputs", {}).get(output) == content_hash
+
+    def record_dataset(self, name, fingerprint, outputs):
+        """
+        Remember the dataset fingerprint the outputs are now built from
+        """
+        dataset = self.datasets.setdefault(name, {"outputs": {}})
+        dataset.setdefault("outputs", {})
+        for output in outputs:
+            dataset["outputs"][output] = fingerprint
+
+    def record_table(self, name, content_hash, rows, outputs):
+        """
+        Remember the table content and the outputs it is now in
+        """
+        table = self.tables.setdefault(name, {"outputs": {}})
+        table["hash"] = content_hash
+        table["rows"] = rows
+        for output in outputs:
+            table["outputs"][output] = content_hash
+
+    def save(self):
+        if self.path is None:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # same as the key map, a crash halfway must not leave a corrupt manifest
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"datasets": self.datasets, "tables": self.tables}, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
\ No newline at end of file